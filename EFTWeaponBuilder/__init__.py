@@ -6,15 +6,32 @@ bl_info = {
 
 import bpy
 import os
-import json
+import time
 import string
+import zlib
+import uuid
+import queue
+import threading
 import re
 import bpy.app.timers
-
+from bpy.app.handlers import persistent
+
+from . import library_index
+from . import compat_db
+from . import mod_search
+from . import asset_cache
+from . import auto_attach
+from . import presets
+from . import profiler
+from .profiler import timed
+from .texture_resolver import TextureResolver
+from .name_matcher import NameMatcher
+from .bone_builder import convert_empty_roots_to_armatures
+
+@timed
 def ensure_eft_shader_loaded():
     shader_name = "EFT Shader v1"
     if shader_name in bpy.data.node_groups:
-        print(f"[EFT Addon] Node group '{shader_name}' already loaded.")
         return
 
     addon_dir = os.path.dirname(__file__)
@@ -26,6 +43,7 @@ def ensure_eft_shader_loaded():
 
     print(f"[EFT Addon] Attempting to load from {blend_path}")
 
+    profiler.recorder.touch(blend_path)
     try:
         with bpy.data.libraries.load(blend_path, link=False) as (data_from, data_to):
             # 🛠 Fix: Accessing node_groups must be explicit
@@ -41,6 +59,7 @@ def ensure_eft_shader_loaded():
 
 # --- CLEAR OUT OLD DYNAMIC PROPS ---
 def clear_mod_props():
+    mod_prop_sources.clear()
     for attr in dir(bpy.types.Scene):
         if attr.startswith("mod_"):
             try:
@@ -50,198 +69,485 @@ def clear_mod_props():
 
 # Global caches
 weapon_mod_data = {}
-weapon_compat_data = {}
+weapon_compat_data = compat_db.CompatDB()
 bone_items_cache = []
 
+# On-disk library indexes (see library_index.py)
+weapon_mod_index = None
+weapon_folder_index = None
+
 
+@timed
 def load_mod_data(root):
-    global weapon_mod_data
+    global weapon_mod_data, weapon_mod_index
     base = os.path.abspath(root)
     weapon_mod_data = {}
     try:
-        for category in os.listdir(base):
-            cat_path = os.path.join(base, category)
-            if os.path.isdir(cat_path):
-                weapon_mod_data[category] = [
-                    d for d in os.listdir(cat_path)
-                    if os.path.isdir(os.path.join(cat_path, d))
-                ]
+        weapon_mod_index = library_index.get_index(base)
+        weapon_mod_data = weapon_mod_index.mod_names()
         print(f"Scanned mod folders in '{base}'")
     except Exception as e:
         weapon_mod_data = {}
+        weapon_mod_index = None
         print(f"Failed to scan mod folders: {e}")
+    refresh_mod_items_cache()
 
 weapon_folder_data = {}
 
 def on_weapons_folder_update(self, context):
-    global weapon_folder_data
     path = bpy.path.abspath(self.weapons_folder)
-    weapon_folder_data = {}
+    if not bpy.app.background:
+        if self.weapons_folder and os.path.isdir(path):
+            start_scan("weapons", path)
+        else:
+            cancel_scan("weapons")
+            set_library("weapons")
+        return
+    set_library("weapons")
     try:
-        for category in os.listdir(path):
-            cat_path = os.path.join(path, category)
-            if os.path.isdir(cat_path):
-                weapon_folder_data[category] = [
-                    w for w in os.listdir(cat_path)
-                    if os.path.isdir(os.path.join(cat_path, w))
-                ]
+        set_library("weapons", library_index.get_index(path))
         print(f"Scanned weapons in '{path}'")
-        build_weapon_menus()
     except Exception as e:
         print(f"Error scanning weapons: {e}")
 
-def build_weapon_menus():
-    global weapon_folder_data
-
-    # Unregister old dynamic classes
-    for cls in list(bpy.types.Menu.__subclasses__()):
-        if cls.__name__.startswith("EFT_MT_weapon_category_") or cls.__name__.startswith("EFT_MT_weapon_range_"):
-            try:
-                bpy.utils.unregister_class(cls)
-            except:
-                pass
-
-    # Group categories by letter range (A–C, D–F, etc.)
-    groups = {
-        "A–C": [],
-        "D–F": [],
-        "G–I": [],
-        "J–L": [],
-        "M–O": [],
-        "P–R": [],
-        "S–U": [],
-        "V–Z": [],
-        "Other": []
-    }
-
-    def get_group(letter):
-        letter = letter.upper()
-        for group in groups:
-            if group == "Other":
-                continue
-            start, end = group.split("–")
-            if start <= letter <= end:
-                return group
-        return "Other"
-
-    for category in weapon_folder_data:
-        first_char = category[0]
-        group = get_group(first_char)
-        groups[group].append(category)
-
-    # Register menus for each category
-    for category, weapons in weapon_folder_data.items():
-        cls_name = f"EFT_MT_weapon_category_{category}"
-
-        def make_draw_fn(category, weapons):
-            def draw_fn(self, context):
-                layout = self.layout
-                for weapon in sorted(weapons):
-                    op = layout.operator("wm.eft_select_weapon", text=weapon, icon='FILE_3D')
-                    op.weapon_path = f"{category}/{weapon}"
-            return draw_fn
-
-        new_cls = type(cls_name, (bpy.types.Menu,), {
-            "bl_idname": cls_name,
-            "bl_label": category,
-            "draw": make_draw_fn(category, weapons)
-        })
-
-        bpy.utils.register_class(new_cls)
-
-    # Register grouped range menus (e.g., A–C)
-    for group_name, categories in groups.items():
-        if not categories:
-            continue
-
-        cls_name = f"EFT_MT_weapon_range_{group_name.replace('–', '_')}"
+# Presorted (identifier, label, description) items for the weapon browser,
+# rebuilt only when the weapons folder is rescanned
+weapon_items_cache = []
 
-        def make_range_draw_fn(categories):
-            def draw_fn(self, context):
-                layout = self.layout
-                for category in sorted(categories):
-                    layout.menu(f"EFT_MT_weapon_category_{category}")
-            return draw_fn
 
-        new_cls = type(cls_name, (bpy.types.Menu,), {
-            "bl_idname": cls_name,
-            "bl_label": group_name,
-            "draw": make_range_draw_fn(categories)
-        })
+def refresh_weapon_items():
+    global weapon_items_cache
+    items = [
+        (f"{category}/{w}", f"{w} ({category})", "")
+        for category, weapons in weapon_folder_data.items()
+        for w in weapons
+    ]
+    items.sort(key=lambda item: item[1].lower())
+    weapon_items_cache = items
 
-        bpy.utils.register_class(new_cls)
 
 def get_weapon_choices():
-    global weapon_folder_data
-    items = []
-    for category, weapons in weapon_folder_data.items():
-        for w in weapons:
-            full = f"{category}/{w}"
-            label = f"{w} ({category})"
-            items.append((full, label, ""))
-    return items or [("NONE", "None", "")]
+    return weapon_items_cache or [("NONE", "None", "")]
 
 
+@timed
 def load_compat_data(root):
     global weapon_compat_data
     base = os.path.abspath(root)
-    path = os.path.join(base, "weapon_compatibility.json")
+    path = os.path.join(base, compat_db.COMPAT_FILENAME)
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            weapon_compat_data = json.load(f)
+        # Compiled, indexed form of the JSON (see compat_db.py)
+        weapon_compat_data = compat_db.load(base)
         print(f"Loaded compatibility data from '{path}'")
     except Exception as e:
-        weapon_compat_data = {}
+        weapon_compat_data = compat_db.CompatDB()
         print(f"Failed to load compatibility data: {e}")
+    refresh_mod_items_cache()
+
+
+# category -> items callback of its registered Scene.mod_<category> property.
+# Properties are only ever added here, so rescans keep them (and their
+# selections) in place; the lists they show come from the mod item caches.
+mod_prop_sources = {}
 
 
 def rebuild_mod_props():
-    clear_mod_props()
     cats = set(weapon_mod_data.keys())
-    for w in weapon_compat_data:
-        cats.update(weapon_compat_data[w].keys())
-    for cat in cats:
+    cats.update(weapon_compat_data.categories)
+    added = 0
+    for cat in sorted(cats):
+        if cat in mod_prop_sources:
+            continue
+        source = mod_prop_sources[cat] = build_items_cb(cat)
         setattr(
             bpy.types.Scene,
             f"mod_{cat}",
-            bpy.props.EnumProperty(name=cat, items=build_items_cb(cat))
+            bpy.props.EnumProperty(name=cat, items=source)
         )
+        added += 1
+    if added:
+        print(f"[EFT Addon] Registered {added} new mod categories")
 
 
 def on_mods_folder_update(self, context):
-    root = self.mods_folder
-    if root and os.path.isdir(bpy.path.abspath(root)):
-        load_mod_data(root)
-        load_compat_data(root)
-        rebuild_mod_props()
+    root = bpy.path.abspath(self.mods_folder)
+    if self.mods_folder and os.path.isdir(root):
+        if bpy.app.background:
+            # No event loop to poll a background scan from
+            load_mod_data(root)
+            load_compat_data(root)
+            rebuild_mod_props()
+        else:
+            start_scan("mods", root)
+    else:
+        cancel_scan("mods")
+        set_library("mods")
     return None
 
 
+# --- BACKGROUND SCANNING ---
+# Folder scans run on a worker thread and stream each finished category back
+# through scan_queue; poll_scans (a bpy.app.timers function) applies them on
+# the main thread so dropdowns fill in while the disk is walked. Starting a
+# new scan of the same kind bumps its token, which cancels the old worker and
+# makes its remaining messages stale.
+scan_queue = queue.Queue()
+scan_tokens = {"mods": 0, "weapons": 0}
+scan_status = {}
+
+
+def scan_worker(kind, root, token):
+    def cancelled():
+        return scan_tokens[kind] != token
+
+    def progress(category, entry):
+        scan_queue.put((kind, token, "category", category, list(entry["mods"])))
+
+    try:
+        index = library_index.LibraryIndex.load(root)
+        if index.refresh(progress, cancelled):
+            index.save()
+        compat = None
+        if kind == "mods":
+            try:
+                compat = compat_db.load(root)
+            except Exception as e:
+                print(f"Failed to load compatibility data: {e}")
+        scan_queue.put((kind, token, "done", index, compat))
+    except library_index.ScanCancelled:
+        pass
+    except Exception as e:
+        scan_queue.put((kind, token, "error", e, None))
+
+
+def set_library(kind, index=None, compat=None):
+    # Point the mods or weapons globals at `index` (None: nothing loaded) and
+    # drop everything derived from the previous folder
+    global weapon_mod_data, weapon_mod_index, weapon_compat_data, mod_name_matcher
+    global weapon_folder_data, weapon_folder_index
+    data = index.mod_names() if index is not None else {}
+    if kind == "mods":
+        weapon_mod_index = index
+        weapon_mod_data = data
+        weapon_compat_data = compat or compat_db.CompatDB()
+        mod_name_matcher = None
+        invalidate_mod_items()
+        refresh_mod_items_cache()
+    else:
+        weapon_folder_index = index
+        weapon_folder_data = data
+        refresh_weapon_items()
+
+
+# `index` / `compat`: already loaded data for `root` (e.g. the persisted
+# index) to show until the scan replaces it
+def start_scan(kind, root, index=None, compat=None):
+    scan_tokens[kind] += 1
+    scan_status[kind] = f"Scanning {kind}…"
+    if index is not None:
+        library_index.publish(index)
+    set_library(kind, index, compat)
+    if kind == "mods" and (index is not None or compat is not None):
+        rebuild_mod_props()
+    threading.Thread(target=scan_worker, args=(kind, root, scan_tokens[kind]), daemon=True).start()
+    if not bpy.app.timers.is_registered(poll_scans):
+        bpy.app.timers.register(poll_scans, first_interval=0.1)
+
+
+def cancel_scan(kind):
+    scan_tokens[kind] += 1
+    scan_status.pop(kind, None)
+
+
+# --- LAZY RESTORE ---
+# The folder paths are saved with the scene but the data behind the dropdowns
+# is not. After startup or a file load the first panel draw shows each saved
+# folder's persisted index (a single JSON read, no disk walk) and starts a
+# background scan that swaps in the refreshed index when it's done.
+restore_pending = True
+
+
+@persistent
+def on_load_mark_restore(dummy):
+    global restore_pending
+    for kind in scan_tokens:
+        cancel_scan(kind)
+        set_library(kind)
+    restore_pending = True
+
+
+def restore_libraries(scene):
+    global restore_pending
+    restore_pending = False
+    p = scene.eft_props
+    for kind, folder in (("mods", p.mods_folder), ("weapons", p.weapons_folder)):
+        root = bpy.path.abspath(folder) if folder else ""
+        if not (root and os.path.isdir(root)):
+            continue
+        index = library_index.LibraryIndex.load(root)
+        compat = None
+        if kind == "mods":
+            try:
+                compat = compat_db.load(root)
+            except Exception as e:
+                print(f"Failed to load compatibility data: {e}")
+        start_scan(kind, root, index if index.categories else None, compat)
+
+
+def tag_panel_redraw():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+def poll_scans():
+    touched = set()
+    while True:
+        try:
+            kind, token, what, payload, extra = scan_queue.get_nowait()
+        except queue.Empty:
+            break
+        if token != scan_tokens[kind]:
+            continue
+        touched.add(kind)
+
+        if what == "category":
+            data = weapon_mod_data if kind == "mods" else weapon_folder_data
+            data[payload] = extra
+            scan_status[kind] = f"Scanning {kind}… {len(data)} categories"
+        elif what == "done":
+            library_index.publish(payload)
+            set_library(kind, payload, extra)
+            if kind == "mods":
+                print(f"Scanned mod folders in '{payload.root}'")
+            else:
+                print(f"Scanned weapons in '{payload.root}'")
+            scan_status.pop(kind, None)
+        else:
+            print(f"Error scanning {kind}: {payload}")
+            scan_status.pop(kind, None)
+
+    if "mods" in touched:
+        invalidate_mod_items()
+        refresh_mod_items_cache()
+        rebuild_mod_props()
+    if "weapons" in touched:
+        refresh_weapon_items()
+    if touched:
+        tag_panel_redraw()
+    return 0.1 if scan_status else None
+
+
 def get_bone_items(self, context):
+    if bone_index_dirty:
+        rebuild_bone_items()
     return bone_items_cache or [("", "No mod bones", "")]
 
 
+# --- BONE LIST INDEX ---
+# Per-armature dropdown entries for the hierarchy picked with Refresh Mod Bone
+# List, kept current by a depsgraph handler that only re-indexes armatures
+# that were added, changed or detached.
+bone_index = {}
+bone_index_root = None
+bone_index_dirty = False
+
+
+def index_armature_bones(arm):
+    clean_name = arm.name.removeprefix("Armature_")
+    bone_index[arm.name] = [
+        (f"{arm.name}::{b.name}", f"{b.name} ({clean_name})", "")
+        for b in arm.data.bones if b.name.startswith("mod_")
+    ]
+
+
+def in_bone_tree(obj):
+    while obj:
+        if obj.name == bone_index_root:
+            return True
+        if obj.type != 'ARMATURE':
+            return False
+        obj = obj.parent
+    return False
+
+
+def rebuild_bone_items():
+    global bone_items_cache, bone_index_dirty
+    bone_items_cache = [item for items in bone_index.values() for item in items]
+    bone_index_dirty = False
+
+
+def reset_bone_index(root=None):
+    global bone_index_root, bone_index_dirty
+    bone_index.clear()
+    bone_index_root = root.name if root else None
+
+    def walk(arm):
+        index_armature_bones(arm)
+        for child in arm.children:
+            if child.type == 'ARMATURE':
+                walk(child)
+    if root:
+        walk(root)
+    bone_index_dirty = True
+
+
+@persistent
+def on_depsgraph_update(scene, depsgraph):
+    global bone_index_dirty
+    if not bone_index_root:
+        return
+    for update in depsgraph.updates:
+        id_data = update.id.original
+        if isinstance(id_data, bpy.types.Object):
+            if id_data.type != 'ARMATURE':
+                continue
+            if in_bone_tree(id_data):
+                # Moving an indexed armature only changes its transform
+                if id_data.name not in bone_index or update.is_updated_geometry:
+                    index_armature_bones(id_data)
+                    bone_index_dirty = True
+            elif id_data.name in bone_index:
+                del bone_index[id_data.name]
+                bone_index_dirty = True
+        elif isinstance(id_data, bpy.types.Armature):
+            # Bones added, removed or renamed
+            for name in bone_index:
+                arm = bpy.data.objects.get(name)
+                if arm and arm.data == id_data:
+                    index_armature_bones(arm)
+                    bone_index_dirty = True
+        elif isinstance(id_data, (bpy.types.Collection, bpy.types.Scene)):
+            # Deleted or renamed objects
+            for name in [n for n in bone_index if n not in bpy.data.objects]:
+                del bone_index[name]
+                bone_index_dirty = True
+
+
+@persistent
+def on_load_reset_bone_index(dummy):
+    reset_bone_index()
+
+
 def get_weapon_items(self, context):
     items = [("NONE", "None", "")] + [(w, w, "") for w in weapon_compat_data.keys()]
     return items or [("NONE", "None", "")]
 
 
+# --- MOD DROPDOWN ITEM CACHE ---
+# Items for the mod_<category> enums, keyed by (category, weapon_type, filter).
+# Only cleared when the mod index or compat data actually changes. Keeping the
+# lists here also keeps Blender's enum strings alive between redraws.
+mod_items_cache = {}
+mod_names_cache = {}
+mod_items_stamp = None
+
+# Ranked filter_text results for every category at once (see mod_search.py)
+mod_search_index = None
+search_results_cache = {}
+
+
+def refresh_mod_items_cache():
+    global mod_items_stamp, mod_search_index
+    stamp = (
+        weapon_mod_index and (weapon_mod_index.root, weapon_mod_index.generation),
+        weapon_compat_data.source_hash,
+    )
+    if stamp != mod_items_stamp:
+        mod_items_stamp = stamp
+        invalidate_mod_items()
+
+
+def invalidate_mod_items():
+    global mod_search_index
+    mod_items_cache.clear()
+    mod_names_cache.clear()
+    search_results_cache.clear()
+    mod_search_index = None
+
+
+def get_search_results(filter_str):
+    global mod_search_index
+    results = search_results_cache.get(filter_str)
+    if results is None:
+        if mod_search_index is None:
+            groups = {cat: list(mods) for cat, mods in weapon_mod_data.items()}
+            for cat, mods in weapon_compat_data.mods_by_category().items():
+                groups.setdefault(cat, []).extend(mods)
+            mod_search_index = mod_search.ModSearchIndex(groups)
+        results = search_results_cache[filter_str] = mod_search_index.query(filter_str)
+    return results
+
+
+def get_filtered_mods(category, w, filter_str):
+    key = (category, w, filter_str)
+    mods = mod_names_cache.get(key)
+    if mods is not None:
+        return mods
+
+    if filter_str:
+        # Ranked search hits, restricted to what the unfiltered list offers
+        allowed = set(get_filtered_mods(category, w, ""))
+        mods = [m for m in get_search_results(filter_str).get(category, []) if m in allowed]
+    elif not w or w == "NONE":
+        mods = weapon_mod_data.get(category, [])
+    else:
+        mods = weapon_compat_data.get(w, {}).get(category, [])
+
+    mod_names_cache[key] = mods
+    return mods
+
+
+def mod_item_number(name):
+    # Enum values are what .blend files store, so they must not depend on the
+    # item's position in a list that changes with filters and rescans
+    return zlib.crc32(name.encode('utf-8')) & 0x7fffffff or 1
+
+
 def build_items_cb(category):
+    # bpy.props needs a plain function for dynamic items, so each category
+    # gets one, created once and kept in mod_prop_sources
     def items(self, context):
         p = context.scene.eft_props
-        filter_str = p.filter_text.lower()
-        w = p.weapon_type
-        if not w or w == "NONE":
-            mods = weapon_mod_data.get(category, [])
-        else:
-            mods = weapon_compat_data.get(w, {}).get(category, [])
-        # apply text filter
-        if filter_str:
-            mods = [m for m in mods if filter_str in m.lower()]
-        return [("NONE", "None", "")] + [(m, m, "") for m in mods]
+        key = (category, p.weapon_type, p.filter_text)
+        cached = mod_items_cache.get(key)
+        if cached is None:
+            mods = get_filtered_mods(category, p.weapon_type, p.filter_text.lower())
+            cached = [("NONE", "None", "", 0)]
+            used = {0}
+            for m in mods:
+                number = mod_item_number(m)
+                while number in used:
+                    # Hash collision within one list; very rare
+                    number = number % 0x7fffffff + 1
+                used.add(number)
+                cached.append((m, m, "", number))
+            mod_items_cache[key] = cached
+        return cached
     return items
 
 
+# --- PROFILER SETTINGS ---
+def apply_profiler_settings(p):
+    recorder = profiler.recorder
+    recorder.enabled = p.profile_enabled
+    recorder.use_cprofile = p.profile_cprofile
+    if recorder.runs.maxlen != p.profile_runs:
+        recorder.set_max_runs(p.profile_runs)
+
+
+def on_profiler_settings_update(self, context):
+    apply_profiler_settings(self)
+
+
+@persistent
+def on_load_apply_profiler(dummy):
+    scene = bpy.context.scene
+    if scene is not None and hasattr(scene, "eft_props"):
+        apply_profiler_settings(scene.eft_props)
+
+
 class EFTProperties(bpy.types.PropertyGroup):
     bone_list: bpy.props.EnumProperty(name="Mod Bone", items=get_bone_items)
     use_tail: bpy.props.BoolProperty(
@@ -267,6 +573,61 @@ class EFTProperties(bpy.types.PropertyGroup):
         description="Filter mod dropdowns by name",
         default=""
     )
+    texture_mode: bpy.props.EnumProperty(
+        name="Texture Mode",
+        description="Material setup applied to mods prepared for the asset cache",
+        items=[
+            ('EFT', "EFT Shader", ""),
+            ('PRINCIPLED', "Principled", ""),
+            ('NONE', "None", ""),
+        ],
+        default='EFT'
+    )
+    import_mode: bpy.props.EnumProperty(
+        name="Import Mode",
+        items=[
+            ('IMPORT', "Import", "Always import a fresh copy of the FBX"),
+            ('LINKED', "Linked Duplicate", "Reuse mods already in the scene, sharing their mesh and material data"),
+        ],
+        default='IMPORT'
+    )
+    use_asset_cache: bpy.props.BoolProperty(
+        name="Use Asset Cache",
+        description="Build bones and textures once per FBX and append later imports from a cached .blend",
+        default=False
+    )
+    asset_cache_dir: bpy.props.StringProperty(
+        name="Cache Folder",
+        description="Where cached mods are stored (empty: user cache folder)",
+        subtype='DIR_PATH',
+        default=""
+    )
+    asset_cache_budget_mb: bpy.props.IntProperty(
+        name="Cache Size (MB)",
+        description="Least recently used entries are removed above this size",
+        default=2048,
+        min=64
+    )
+    profile_enabled: bpy.props.BoolProperty(
+        name="Profile Operators",
+        description="Record wall time, helper calls, files touched and the size of the files read for every EFT operator run",
+        default=False,
+        update=on_profiler_settings_update
+    )
+    profile_cprofile: bpy.props.BoolProperty(
+        name="cProfile",
+        description="Also capture a cProfile summary of each run (slows the run down)",
+        default=False,
+        update=on_profiler_settings_update
+    )
+    profile_runs: bpy.props.IntProperty(
+        name="Runs Kept",
+        description="Number of recent runs kept for the panel and export",
+        default=10,
+        min=1,
+        max=100,
+        update=on_profiler_settings_update
+    )
 
 class EFT_OT_build_bones(bpy.types.Operator):
     bl_idname = "object.build_eft_bones"
@@ -274,90 +635,6 @@ class EFT_OT_build_bones(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        from mathutils import Vector
-
-        def create_bone_from_empty(empty, ebones, parent_bone=None, armature_matrix_inv=None):
-            head_world = empty.matrix_world.to_translation()
-            head_local = armature_matrix_inv @ head_world
-
-            direction_world = empty.matrix_world.to_quaternion() @ Vector((0, 0.1, 0))
-            tail_world = head_world + direction_world
-            tail_local = armature_matrix_inv @ tail_world
-
-            if (tail_local - head_local).length < 0.001:
-                tail_local = head_local + Vector((0, 0.01, 0))
-
-            bone = ebones.new(empty.name)
-            bone.head = head_local
-            bone.tail = tail_local
-            if parent_bone:
-                bone.parent = parent_bone
-            return bone
-
-        def convert_empty_root_to_armature(root_name):
-            root_empty = bpy.data.objects.get(root_name)
-            if not root_empty:
-                self.report({'ERROR'}, f"Root empty '{root_name}' not found.")
-                return
-
-            root_world_matrix = root_empty.matrix_world.copy()
-            empties = []
-
-            def gather_empties(obj):
-                if obj.type == 'EMPTY':
-                    empties.append(obj)
-                    for child in obj.children:
-                        gather_empties(child)
-            gather_empties(root_empty)
-            empty_names = [e.name for e in empties]
-
-            bpy.ops.object.select_all(action='DESELECT')
-            bpy.ops.object.armature_add()
-            armature = bpy.context.active_object
-            armature.name = "Armature_" + root_empty.name
-            armature.matrix_world = root_world_matrix
-            armature_matrix_inv = armature.matrix_world.inverted()
-
-            bpy.ops.object.mode_set(mode='EDIT')
-            ebones = armature.data.edit_bones
-            if "Bone" in ebones:
-                ebones.remove(ebones["Bone"])
-
-            def add_bones_recursive(empty_obj, parent_bone=None):
-                bone = create_bone_from_empty(empty_obj, ebones, parent_bone, armature_matrix_inv)
-                for child in empty_obj.children:
-                    if child.type == 'EMPTY':
-                        add_bones_recursive(child, bone)
-
-            add_bones_recursive(root_empty)
-            bpy.ops.object.mode_set(mode='OBJECT')
-
-            lod1_meshes = [obj for obj in bpy.data.objects if obj.type == 'MESH' and obj.name.endswith('_LOD1')]
-            for obj in lod1_meshes:
-                bpy.data.objects.remove(obj, do_unlink=True)
-
-            mesh_objs = []
-            for obj in bpy.data.objects:
-                if obj.type == 'MESH' and obj.parent and obj.parent.name in empty_names:
-                    mesh_objs.append(obj)
-                    matrix = obj.matrix_world.copy()
-                    obj.parent = armature
-                    obj.matrix_world = matrix
-
-            bpy.ops.object.select_all(action='DESELECT')
-            for obj in mesh_objs:
-                obj.select_set(True)
-                bpy.context.view_layer.objects.active = obj
-                bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center='BOUNDS')
-                obj.select_set(False)
-
-            for name in empty_names:
-                obj = bpy.data.objects.get(name)
-                if obj:
-                    bpy.data.objects.remove(obj, do_unlink=True)
-
-            print(f"✅ Done: {root_name}")
-
         selected_root_names = [
             obj.name for obj in bpy.context.selected_objects
             if obj.type == 'EMPTY' and not obj.parent
@@ -367,8 +644,7 @@ class EFT_OT_build_bones(bpy.types.Operator):
             self.report({'WARNING'}, "No root empties selected.")
             return {'CANCELLED'}
 
-        for name in selected_root_names:
-            convert_empty_root_to_armature(name)
+        convert_empty_roots_to_armatures(selected_root_names, self.report)
 
         self.report({'INFO'}, f"Built bones for: {', '.join(selected_root_names)}")
         return {'FINISHED'}
@@ -379,28 +655,14 @@ class EFT_OT_refresh_bone_list(bpy.types.Operator):
     bl_label = "Refresh Mod Bone List"
 
     def execute(self, context):
-        global bone_items_cache
-        bone_items_cache = []
-
         root_armature = next((o for o in context.selected_objects if o.type == 'ARMATURE'), None)
         if not root_armature:
             self.report({'ERROR'}, "No armature selected")
             return {'CANCELLED'}
 
-        def collect_mod_bones_recursively(arm_obj):
-            items = []
-            if arm_obj.type != 'ARMATURE':
-                return items
-            for b in arm_obj.data.bones:
-                if b.name.startswith("mod_"):
-                    clean_name = arm_obj.name.removeprefix("Armature_")
-                    label = f"{b.name} ({clean_name})"
-                    items.append((f"{arm_obj.name}::{b.name}", label, ""))
-            for child in arm_obj.children:
-                items.extend(collect_mod_bones_recursively(child))
-            return items
-
-        bone_items_cache = collect_mod_bones_recursively(root_armature)
+        # Picks the hierarchy; later changes are tracked by on_depsgraph_update
+        reset_bone_index(root_armature)
+        rebuild_bone_items()
         self.report({'INFO'}, f"Found {len(bone_items_cache)} mod bones")
         return {'FINISHED'}
 
@@ -420,6 +682,31 @@ class EFT_OT_set_bone_display_stick(bpy.types.Operator):
 
 
 
+@timed
+def attach_mod_to_bone(mod, target_arm, bone_name, use_tail):
+    # Parent `mod` to a bone of `target_arm` at its head or tail. Returns False
+    # if the bone doesn't exist.
+    bone = target_arm.data.bones.get(bone_name)
+    pose = target_arm.pose.bones.get(bone_name)
+    if not bone or not pose:
+        return False
+
+    pt = bone.tail_local if use_tail else bone.head_local
+    world = target_arm.matrix_world @ pt
+
+    mod.parent = target_arm
+    mod.parent_type = 'BONE'
+    mod.parent_bone = bone_name
+    mod.matrix_parent_inverse.identity()
+
+    mw = target_arm.matrix_world @ pose.matrix
+    loc = mw.inverted() @ world
+    if use_tail:
+        loc.y *= -1
+    mod.location = loc
+    return True
+
+
 class EFT_OT_attach_mod(bpy.types.Operator):
     bl_idname = "object.attach_eft_mod"
     bl_label = "Attach EFT Mod"
@@ -445,60 +732,362 @@ class EFT_OT_attach_mod(bpy.types.Operator):
             self.report({'ERROR'}, f"Target armature '{armature_name}' not found")
             return {'CANCELLED'}
 
-        bone = target_arm.data.bones.get(bone_name)
-        pose = target_arm.pose.bones.get(bone_name)
-
-        if not bone or not pose:
+        if not attach_mod_to_bone(mod, target_arm, bone_name, props.use_tail):
             self.report({'ERROR'}, f"Bone '{bone_name}' not found in '{armature_name}'")
             return {'CANCELLED'}
 
-        pt = bone.tail_local if props.use_tail else bone.head_local
-        world = target_arm.matrix_world @ pt
+        return {'FINISHED'}
+
+
+# --- AUTO ATTACH ---
+def mod_category(armature_name):
+    name = re.sub(r'\.\d{3}$', '', armature_name.removeprefix("Armature_"))
+    if weapon_mod_index:
+        category, _ = weapon_mod_index.find_category(name)
+        if category:
+            return category
+    categories = weapon_compat_data.categories_for_mod(name)
+    if categories:
+        return categories[0]
+    return auto_attach.category_from_name(name)
+
+
+def armature_tree(root):
+    # {armature: depth} for the root and every armature parented below it
+    tree = {}
+
+    def walk(obj, depth):
+        if obj.type == 'ARMATURE':
+            tree[obj] = depth
+            depth += 1
+        for child in obj.children:
+            walk(child, depth)
+    walk(root, 0)
+    return tree
+
+
+def free_mod_slots(tree):
+    slots = []
+    for arm, depth in tree.items():
+        occupied = {c.parent_bone for c in arm.children if c.parent_type == 'BONE'}
+        for b in arm.data.bones:
+            if b.name.startswith("mod_") and b.name not in occupied:
+                slots.append((depth, arm.name, b.name))
+    return slots
+
+
+@timed
+def auto_attach_mods(context, weapon, mods, use_tail, dry_run=False):
+    # Plan (see auto_attach.py) and, unless dry_run, apply pass by pass
+    plan, unmatched = auto_attach.plan_attachments(
+        free_mod_slots(armature_tree(weapon)),
+        [m.name for m in mods],
+        {m.name: [b.name for b in m.data.bones] for m in mods},
+        mod_category,
+    )
+
+    for pass_no, mod, armature, bone in plan:
+        print(f"[EFT Auto Attach] pass {pass_no}: {mod} → {armature}::{bone}")
+    for mod, reason in unmatched:
+        print(f"[EFT Auto Attach] skipped {mod}: {reason}")
+    if dry_run:
+        return plan, unmatched
+
+    current = None
+    for pass_no, mod, armature, bone in plan:
+        if pass_no != current:
+            # Mods attached in the previous pass must be posed before
+            # anything is placed on their bones
+            context.view_layer.update()
+            current = pass_no
+        attach_mod_to_bone(bpy.data.objects[mod], bpy.data.objects[armature], bone, use_tail)
+    return plan, unmatched
+
+
+class EFT_OT_auto_attach_mods(bpy.types.Operator):
+    bl_idname = "object.auto_attach_mods"
+    bl_label = "Auto Attach Mods"
+    bl_description = (
+        "Attach mod armatures to matching mod_* bones of the active weapon armature. "
+        "Uses the selected armatures, or every unparented armature if only the weapon is selected"
+    )
+    bl_options = {'REGISTER', 'UNDO'}
+
+    dry_run: bpy.props.BoolProperty(
+        name="Dry Run",
+        description="Only report where each mod would go",
+        default=False
+    )
 
-        mod.parent = target_arm
-        mod.parent_type = 'BONE'
-        mod.parent_bone = bone_name
-        mod.matrix_parent_inverse.identity()
+    def execute(self, context):
+        props = context.scene.eft_props
+        weapon = context.active_object
+        if not weapon or weapon.type != 'ARMATURE':
+            self.report({'ERROR'}, "Make the weapon armature active")
+            return {'CANCELLED'}
+
+        tree = armature_tree(weapon)
+        mods = [o for o in context.selected_objects if o.type == 'ARMATURE' and o not in tree]
+        if not mods:
+            mods = [
+                o for o in context.scene.objects
+                if o.type == 'ARMATURE' and not o.parent and o not in tree
+            ]
+        if not mods:
+            self.report({'WARNING'}, "No mod armatures to attach")
+            return {'CANCELLED'}
 
-        mw = target_arm.matrix_world @ pose.matrix
-        loc = mw.inverted() @ world
-        if props.use_tail:
-            loc.y *= -1
-        mod.location = loc
+        plan, unmatched = auto_attach_mods(context, weapon, mods, props.use_tail, self.dry_run)
+        if self.dry_run:
+            self.report({'INFO'}, f"Dry run: {len(plan)} mods would attach, {len(unmatched)} skipped (see console)")
+            return {'FINISHED'}
 
+        for mod, reason in unmatched:
+            self.report({'WARNING'}, f"{mod}: {reason}")
+        passes = plan[-1][0] if plan else 0
+        self.report({'INFO'}, f"Attached {len(plan)} mods in {passes} passes")
         return {'FINISHED'}
 
 class EFT_OT_open_weapon_browser(bpy.types.Operator):
     bl_idname = "wm.eft_weapon_browser"
     bl_label = "Browse Weapons"
+    bl_property = "weapon"
+
+    weapon: bpy.props.EnumProperty(name="Weapon", items=lambda s, c: get_weapon_choices())
+
+    def invoke(self, context, event):
+        context.window_manager.invoke_search_popup(self)
+        return {'RUNNING_MODAL'}
 
     def execute(self, context):
-        bpy.ops.wm.call_menu(name="EFT_MT_weapon_menu")
+        if self.weapon == "NONE":
+            return {'CANCELLED'}
+        context.scene.eft_props.selected_weapon = self.weapon
+        self.report({'INFO'}, f"Selected: {self.weapon}")
         return {'FINISHED'}
 
 
-class EFT_MT_weapon_menu(bpy.types.Menu):
-    bl_label = "Weapons"
-
-    def draw(self, context):
-        layout = self.layout
-        for label in ["A–C", "D–F", "G–I", "J–L", "M–O", "P–R", "S–U", "V–Z", "Other"]:
-            layout.menu(f"EFT_MT_weapon_range_{label.replace('–', '_')}")
+# --- BATCH FBX IMPORT ---
+def source_key(path):
+    # Stored as obj["eft_source"] on the top-level objects of every imported FBX
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+
+def tag_import(objects, path):
+    # Mark the top-level objects of one import (or of an appended or duplicated
+    # copy, whose tops already carry the tags) with the source file and an id
+    # shared only by that copy, so the root empty and any loose meshes of an
+    # FBX can be found together later
+    key = source_key(path)
+    import_id = uuid.uuid4().hex
+    for obj in objects:
+        if not obj.parent or "eft_source" in obj:
+            obj["eft_source"] = key
+            obj["eft_import"] = import_id
+
+
+@timed
+def import_fbx_batch(paths):
+    # Import several FBX files in one pass. Importer calls made from Python
+    # push no undo steps of their own (the calling operator's 'UNDO' flag
+    # records one for the whole batch), and the view layer is updated once at
+    # the end. Returns [(path, seconds, new objects)].
+    results = []
+    for path in paths:
+        before = set(bpy.data.objects)
+        start = time.perf_counter()
+        profiler.recorder.touch(path)
+        with profiler.recorder.span("import_scene.fbx"):
+            bpy.ops.import_scene.fbx('EXEC_DEFAULT', False, filepath=path)
+        elapsed = time.perf_counter() - start
+        new_objects = [o for o in bpy.data.objects if o not in before]
+        tag_import(new_objects, path)
+        results.append((path, elapsed, new_objects))
+        print(f"[EFT Import] {os.path.basename(path)}: {elapsed:.2f}s, {len(new_objects)} objects")
+    bpy.context.view_layer.update()
+    return results
+
+
+# --- ASSET CACHE ---
+def get_asset_cache(props):
+    directory = bpy.path.abspath(props.asset_cache_dir) if props.asset_cache_dir else None
+    return asset_cache.get_cache(directory, props.asset_cache_budget_mb)
+
+
+def collect_hierarchy(obj, out):
+    out.append(obj)
+    for child in obj.children:
+        collect_hierarchy(child, out)
+    return out
+
+
+@timed
+def prepare_imported(context, new_objects, texture_mode, images, report=None):
+    # Build bones and materials for one freshly imported FBX; returns the
+    # objects that make up the finished mod
+    root_names = [o.name for o in new_objects if o.type == 'EMPTY' and not o.parent]
+    other_names = [o.name for o in new_objects if o.type != 'EMPTY' and not o.parent]
+
+    prepared = []
+    for armature in convert_empty_roots_to_armatures(root_names, report):
+        if armature:
+            collect_hierarchy(armature, prepared)
+    for name in other_names:
+        obj = bpy.data.objects.get(name)
+        if obj:
+            collect_hierarchy(obj, prepared)
+
+    if texture_mode != 'NONE':
+        auto_texture_objects(prepared, context, texture_mode, images, report)
+    return prepared
+
+
+@timed
+def import_fbx_cached(context, paths, report=None):
+    # Same result shape as import_fbx_batch. Cache hits are appended from their
+    # .blend; misses are imported, prepared and stored for next time.
+    props = context.scene.eft_props
+    cache = get_asset_cache(props)
+    mode = props.texture_mode
+    storable = True
+    if mode == 'EFT' and get_eft_shader() is None:
+        # Untextured mods must not be stored under the EFT mode
+        if report:
+            report({'WARNING'}, "EFT Shader v1 not found, mods will not be textured or cached")
+        mode = 'NONE'
+        storable = False
+
+    results = []
+    hits = 0
+    misses = []
+    for path in paths:
+        key = cache.lookup(path, mode) if storable else None
+        if key is None:
+            misses.append(path)
+            continue
+        start = time.perf_counter()
+        try:
+            objects = cache.load(key, context.collection)
+        except (OSError, RuntimeError) as e:
+            print(f"[EFT Asset Cache] Could not load entry for {path}: {e}")
+            misses.append(path)
+            continue
+        tag_import(objects, path)
+        elapsed = time.perf_counter() - start
+        results.append((path, elapsed, objects))
+        hits += 1
+        print(f"[EFT Asset Cache] {os.path.basename(path)}: appended in {elapsed:.3f}s")
 
+    images = ImageCache()
+    for path, seconds, new_objects in import_fbx_batch(misses):
+        start = time.perf_counter()
+        prepared = prepare_imported(context, new_objects, mode, images, report)
+        if storable:
+            cache.store(path, mode, prepared)
+        results.append((path, seconds + time.perf_counter() - start, prepared))
 
+    cache.save()
+    return results, hits
 
-class EFT_OT_select_weapon(bpy.types.Operator):
-    bl_idname = "wm.eft_select_weapon"
-    bl_label = "Select Weapon"
 
-    weapon_path: bpy.props.StringProperty()
+class EFT_OT_clear_asset_cache(bpy.types.Operator):
+    bl_idname = "object.clear_asset_cache"
+    bl_label = "Clear Asset Cache"
+    bl_description = "Delete every cached mod .blend"
 
     def execute(self, context):
-        context.scene.eft_props.selected_weapon = self.weapon_path
-        self.report({'INFO'}, f"Selected: {self.weapon_path}")
+        cache = get_asset_cache(context.scene.eft_props)
+        count = len(cache.entries)
+        cache.clear()
+        self.report({'INFO'}, f"Removed {count} cached mods")
         return {'FINISHED'}
 
 
+# --- LINKED DUPLICATES ---
+def find_imported_tops(scene, path):
+    # Top-level objects of the first import of `path` found in the scene
+    key = source_key(path)
+    import_id = None
+    tops = []
+    for obj in scene.objects:
+        if obj.get("eft_source") != key:
+            continue
+        if import_id is None:
+            import_id = obj.get("eft_import")
+        if obj.get("eft_import") == import_id:
+            tops.append(obj)
+    return tops
+
+
+@timed
+def duplicate_linked(tops, collection):
+    # Copy a mod's hierarchy sharing mesh/armature data (and with it the
+    # materials and images). Other mods attached below it are left out.
+    copies = {}
+    tops = set(tops)
+
+    def walk(obj):
+        copies[obj] = obj.copy()
+        collection.objects.link(copies[obj])
+        for child in obj.children:
+            if "eft_source" not in child:
+                walk(child)
+    for top in tops:
+        walk(top)
+
+    for orig, copy in copies.items():
+        if orig.parent in copies:
+            copy.parent = copies[orig.parent]
+        elif orig in tops:
+            copy.parent = None
+            copy.matrix_world = orig.matrix_world.copy()
+    return list(copies.values())
+
+
+@timed
+def import_mod_files(context, paths, report=None):
+    # Import according to the panel's import mode and asset cache settings.
+    # Returns (results, cache hits, linked duplicates); results are shaped
+    # like import_fbx_batch's.
+    props = context.scene.eft_props
+    results = []
+    linked = 0
+    if props.import_mode == 'LINKED':
+        remaining = []
+        for path in paths:
+            tops = find_imported_tops(context.scene, path)
+            if not tops:
+                remaining.append(path)
+                continue
+            start = time.perf_counter()
+            objects = duplicate_linked(tops, context.collection)
+            tag_import(objects, path)
+            results.append((path, time.perf_counter() - start, objects))
+            linked += 1
+            names = ", ".join(sorted(o.name for o in tops))
+            print(f"[EFT Import] {os.path.basename(path)}: linked duplicate of {names}")
+        paths = remaining
+
+    hits = 0
+    if props.use_asset_cache:
+        imported, hits = import_fbx_cached(context, paths, report)
+        results.extend(imported)
+    elif paths:
+        results.extend(import_fbx_batch(paths))
+    return results, hits, linked
+
+
+def format_import_timings(results, hits=0, linked=0):
+    total = sum(t for _, t, _ in results)
+    parts = ", ".join(f"{os.path.splitext(os.path.basename(p))[0]} {t:.2f}s" for p, t, _ in results)
+    notes = ""
+    if hits:
+        notes += f", {hits} from asset cache"
+    if linked:
+        notes += f", {linked} linked duplicates"
+    return f"Imported {len(results)} files in {total:.2f}s ({parts}){notes}"
+
+
 class EFT_OT_import_selected_weapon(bpy.types.Operator):
     bl_idname = "object.import_selected_weapon"
     bl_label = "Import Selected Weapon"
@@ -517,14 +1106,16 @@ class EFT_OT_import_selected_weapon(bpy.types.Operator):
             self.report({'ERROR'}, f"FBX not found at:\n{fbx_path}")
             return {'CANCELLED'}
 
-        bpy.ops.import_scene.fbx(filepath=fbx_path)
-        self.report({'INFO'}, f"Imported: {weapon}")
+        results, hits, linked = import_mod_files(context, [fbx_path], self.report)
+        source = " (linked duplicate)" if linked else " from asset cache" if hits else ""
+        self.report({'INFO'}, f"Imported: {weapon}{source} ({results[0][1]:.2f}s)")
         return {'FINISHED'}
 
 
 class EFT_OT_import_mods(bpy.types.Operator):
     bl_idname = "object.import_all_mods"
     bl_label = "Import Selected Mods"
+    bl_options = {'REGISTER', 'UNDO'}
     def execute(self, context):
         sc = context.scene; p = sc.eft_props
         root = bpy.path.abspath(p.mods_folder)
@@ -533,14 +1124,20 @@ class EFT_OT_import_mods(bpy.types.Operator):
             if p.weapon_type and p.weapon_type != 'NONE'
             else weapon_mod_data
         )
+        paths = []
         for cat in categories:
             sel = getattr(sc, f"mod_{cat}", "NONE")
             if sel not in (None, 'NONE'):
                 fbx = os.path.join(root, cat, sel, f"{sel}.fbx")
                 if os.path.exists(fbx):
-                    bpy.ops.import_scene.fbx(filepath=fbx)
+                    paths.append(fbx)
                 else:
                     self.report({'WARNING'}, f"Missing {fbx}")
+
+        if paths:
+            # One import pass and a single undo step for the whole build
+            results, hits, linked = import_mod_files(context, paths, self.report)
+            self.report({'INFO'}, format_import_timings(results, hits, linked))
         return {'FINISHED'}
 
 class EFT_OT_reset_mod_selection(bpy.types.Operator):
@@ -562,6 +1159,26 @@ class EFT_OT_reset_mod_selection(bpy.types.Operator):
         self.report({'INFO'}, "Mod selections reset to None")
         return {'FINISHED'}
 
+# Automaton over every mod folder name (see name_matcher.py), rebuilt when the
+# mods index changes
+mod_name_matcher = None
+mod_name_matcher_stamp = None
+
+
+def get_mod_name_matcher():
+    global mod_name_matcher, mod_name_matcher_stamp
+    stamp = weapon_mod_index and (weapon_mod_index.root, weapon_mod_index.generation)
+    if mod_name_matcher is None or stamp != mod_name_matcher_stamp:
+        mod_name_matcher = NameMatcher(
+            (mod.lower(), (category, mod))
+            for category, mods in weapon_mod_data.items()
+            for mod in mods
+        )
+        mod_name_matcher_stamp = stamp
+    return mod_name_matcher
+
+
+@timed
 def find_texture_folder_for(obj, context):
     props = context.scene.eft_props
     mods_path = bpy.path.abspath(props.mods_folder)
@@ -573,15 +1190,11 @@ def find_texture_folder_for(obj, context):
         parent_name = obj.parent.name.lower()
         if not ("weapon_" in parent_name or "armature_weapon" in parent_name):
             mod_folder = parent_name.replace("armature_", "")
-            mod_path = os.path.join(mods_path, mod_folder)
-            # Search all subfolders in mods_path for a match
-            for category in os.listdir(mods_path):
-                category_path = os.path.join(mods_path, category)
-                if not os.path.isdir(category_path):
-                    continue
-
-                candidate_path = os.path.join(category_path, mod_folder)
-                if os.path.isdir(candidate_path):
+            # Look the folder up in the mods index instead of re-listing every category
+            if weapon_mod_index:
+                category, mod_name = weapon_mod_index.find_category(mod_folder)
+                if category:
+                    candidate_path = weapon_mod_index.mod_path(category, mod_name)
                     print(f"[AutoTexture] {obj.name} → using mod folder: {candidate_path}")
                     return candidate_path
 
@@ -591,16 +1204,16 @@ def find_texture_folder_for(obj, context):
 
 
 
-    # 2. Fallback to weapon_mod_data mesh name matching (original working method)
+    # 2. Fallback to the longest mod folder name contained in the mesh name
     if hasattr(context.scene, "eft_props") and hasattr(context.scene.eft_props, "mods_folder"):
         base = obj.name.rsplit("_LOD0", 1)[0].lower()
-        for category, mods in weapon_mod_data.items():
-            for mod in mods:
-                if mod.lower() in base:
-                    mod_path = os.path.join(mods_path, category, mod)
-                    if os.path.isdir(mod_path):
-                        print(f"[AutoTexture] {obj.name} → using fallback mod folder: {mod_path}")
-                        return mod_path
+        found = get_mod_name_matcher().longest(base)
+        if found:
+            # Entries come from the mods index, so the folder is known to exist
+            category, mod = found
+            mod_path = os.path.join(mods_path, category, mod)
+            print(f"[AutoTexture] {obj.name} → using fallback mod folder: {mod_path}")
+            return mod_path
 
     # 3. Try selected weapon fallback
     if selected_weapon != "NONE":
@@ -618,326 +1231,821 @@ def find_texture_folder_for(obj, context):
 
 
 
+# --- IMAGE CACHE ---
+def image_key(path):
+    return os.path.normcase(os.path.normpath(bpy.path.abspath(path)))
+
+
+class ImageCache:
+    # Path-keyed reuse of bpy.data.images entries during one operator run
+    def __init__(self):
+        self.images = {}
+        self.loaded = 0
+        self.reused = 0
+        for img in bpy.data.images:
+            if img.source == 'FILE' and img.filepath:
+                self.images.setdefault(image_key(img.filepath), img)
+
+    @timed
+    def load(self, path):
+        key = image_key(path)
+        img = self.images.get(key)
+        if img is not None:
+            self.reused += 1
+            return img
+        profiler.recorder.touch(path)
+        img = bpy.data.images.load(path, check_existing=True)
+        self.loaded += 1
+        self.images[key] = img
+        return img
+
+
+@timed
+def purge_duplicate_images():
+    # Remap users of images that share a file path onto one datablock and remove the rest
+    groups = {}
+    for img in bpy.data.images:
+        if img.source == 'FILE' and img.filepath:
+            groups.setdefault(image_key(img.filepath), []).append(img)
+
+    removed = 0
+    for imgs in groups.values():
+        if len(imgs) < 2:
+            continue
+        # Keep the most used datablock, preferring names without a .001 suffix
+        imgs.sort(key=lambda i: (-i.users, re.search(r'\.\d{3}$', i.name) is not None, i.name))
+        keep = imgs[0]
+        for dup in imgs[1:]:
+            dup.user_remap(keep)
+            bpy.data.images.remove(dup)
+            removed += 1
+    return removed
+
+
+class EFT_OT_purge_duplicate_images(bpy.types.Operator):
+    bl_idname = "object.purge_duplicate_images"
+    bl_label = "Purge Duplicate Images"
+    bl_description = "Merge images loaded more than once from the same file"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        removed = purge_duplicate_images()
+        self.report({'INFO'}, f"Removed {removed} duplicate images")
+        return {'FINISHED'}
+
+
+# --- AUTO TEXTURE ---
+@timed
+def build_eft_material(obj, tex_folder, textures, images, shader_group):
+    diff, gloss, norm = textures
+
+    mat = obj.active_material or bpy.data.materials.new(name=f"{obj.name}_Mat")
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    links = mat.node_tree.links
+    nodes.clear()
+
+    out = nodes.new("ShaderNodeGroup")
+    out.node_tree = shader_group
+
+    def load_tex(fn, label, cs, in_c, in_a=None):
+        path = os.path.join(tex_folder, fn) if fn else None
+        if path and os.path.exists(path):
+            tn = nodes.new("ShaderNodeTexImage")
+            tn.label = label
+            tn.image = images.load(path)
+            tn.image.colorspace_settings.name = cs
+            links.new(tn.outputs['Color'], out.inputs[in_c])
+            if in_a:
+                links.new(tn.outputs['Alpha'], out.inputs[in_a])
+
+    load_tex(diff,  "Diffuse",   'sRGB',      'Diffuse Color',  'Diffuse Alpha')
+    load_tex(gloss, "Glossiness",'sRGB',      'Glossiness Color','Glossiness Alpha')
+
+    if norm:
+        tn = nodes.new("ShaderNodeTexImage")
+        tn.label = "Normal"
+        tn.image = images.load(os.path.join(tex_folder, norm))
+        tn.image.colorspace_settings.name = 'Non-Color'
+        links.new(tn.outputs['Color'], out.inputs['Red Normal Color'])
+
+    out_node = nodes.new("ShaderNodeOutputMaterial")
+    links.new(out.outputs['BSDF'], out_node.inputs['Surface'])
+    obj.active_material = mat
+
+
+@timed
+def build_principled_material(obj, tex_folder, textures, images):
+    diff, gloss, norm = textures
+
+    mat = obj.active_material or bpy.data.materials.new(name=f"{obj.name}_Mat")
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    links = mat.node_tree.links
+    nodes.clear()
+
+    output = nodes.new("ShaderNodeOutputMaterial")
+    principled = nodes.new("ShaderNodeBsdfPrincipled")
+    principled.location = (300, 0)
+    principled.inputs['IOR'].default_value = 1.45
+
+    invert = nodes.new("ShaderNodeInvert")
+    invert.location = (0, -150)
+    normal_map = nodes.new("ShaderNodeNormalMap")
+    normal_map.location = (0, -300)
+
+    links.new(principled.outputs["BSDF"], output.inputs["Surface"])
+
+    def load_tex(fn, label, cs):
+        if not fn:
+            return None
+        path = os.path.join(tex_folder, fn)
+        if os.path.exists(path):
+            tex = nodes.new("ShaderNodeTexImage")
+            tex.label = label
+            tex.image = images.load(path)
+            tex.image.colorspace_settings.name = cs
+            return tex
+        return None
+
+    tex_diff = load_tex(diff, "Base Color", "sRGB")
+    tex_gloss = load_tex(gloss, "Gloss", "sRGB")
+    tex_norm = load_tex(norm, "Normal", "Non-Color")
+
+    if tex_diff:
+        links.new(tex_diff.outputs["Color"], principled.inputs["Base Color"])
+        if "Alpha" in tex_diff.outputs:
+            links.new(tex_diff.outputs["Alpha"], principled.inputs["Specular IOR Level"])
+
+    if tex_gloss:
+        links.new(tex_gloss.outputs["Color"], invert.inputs["Color"])
+        links.new(invert.outputs["Color"], principled.inputs["Roughness"])
+        if "Alpha" in tex_gloss.outputs:
+            links.new(tex_gloss.outputs["Alpha"], principled.inputs["Alpha"])
+
+    if tex_norm:
+        links.new(tex_norm.outputs["Color"], normal_map.inputs["Color"])
+        links.new(normal_map.outputs["Normal"], principled.inputs["Normal"])
+
+    obj.active_material = mat
+
+
+def get_eft_shader():
+    # The "EFT Shader v1" node group, appended on first use; None if unavailable
+    ensure_eft_shader_loaded()
+    return bpy.data.node_groups.get("EFT Shader v1")
+
+
+@timed
+def auto_texture_objects(objects, context, mode='EFT', images=None, report=None):
+    # mode: 'EFT' (needs the "EFT Shader v1" node group) or 'PRINCIPLED'.
+    # Without the shader, 'EFT' leaves the objects untextured.
+    images = images or ImageCache()
+    shader_group = None
+    if mode == 'EFT':
+        shader_group = get_eft_shader()
+        if shader_group is None:
+            if report:
+                report({'WARNING'}, "EFT Shader v1 not found, mods were not textured")
+            return images
+    resolver = TextureResolver()
+    for obj in objects:
+        if obj.type != 'MESH' or "_LOD0" not in obj.name:
+            continue
+
+        tex_folder = find_texture_folder_for(obj, context)
+        if not tex_folder:
+            if report:
+                report({'WARNING'}, f"No texture folder found for {obj.name}")
+            continue
+
+        textures = resolver.find_textures(tex_folder, obj.name)
+        if mode == 'EFT':
+            build_eft_material(obj, tex_folder, textures, images, shader_group)
+        else:
+            build_principled_material(obj, tex_folder, textures, images)
+    return images
+
+
 class EFT_OT_auto_texture(bpy.types.Operator):
     bl_idname = "object.auto_texture"
     bl_label = "Auto Texture (EFT Shader)"
     bl_options = {'REGISTER', 'UNDO'}
 
-    def execute(self, context):
-        p = context.scene.eft_props
-        mods_root = bpy.path.abspath(p.mods_folder)
-        shader_group = bpy.data.node_groups.get("EFT Shader v1")
+    purge_duplicates: bpy.props.BoolProperty(
+        name="Purge Duplicates",
+        description="Merge duplicate images left over from earlier runs first",
+        default=False
+    )
 
-        if not shader_group:
+    def execute(self, context):
+        if get_eft_shader() is None:
             self.report({'ERROR'}, "EFT Shader v1 node group not found.")
             return {'CANCELLED'}
 
-        for obj in context.selected_objects:
-            if obj.type != 'MESH' or "_LOD0" not in obj.name:
-                continue
+        if self.purge_duplicates:
+            purge_duplicate_images()
+        images = auto_texture_objects(context.selected_objects, context, 'EFT', report=self.report)
 
-            tex_folder = find_texture_folder_for(obj, context)
-            if not tex_folder:
-                self.report({'WARNING'}, f"No texture folder found for {obj.name}")
-                continue
+        self.report({'INFO'}, f"Loaded {images.loaded} images, reused {images.reused}")
+        return {'FINISHED'}
 
-            files = os.listdir(tex_folder)
-            base_name = obj.name.rsplit("_LOD0", 1)[0].lower()
-
-            def find_texture(obj_name, files, type_keywords):
-                # Normalize name (remove .001, .002)
-                clean_name = re.sub(r'\.\d{3}$', '', obj_name.lower())
-
-                # Match base ending with _lod0
-                match = re.match(r"(.*_lod0)", clean_name)
-                if not match:
-                    return None
-                expected_base = match.group(1)
-
-                def is_valid(f):
-                    name_no_ext = os.path.splitext(f)[0].lower()
-                    return (
-                        "lod1" not in name_no_ext and
-                        name_no_ext.startswith(expected_base) and
-                        any(k in name_no_ext for k in type_keywords)
-                    )
 
-                exact_matches = [f for f in files if is_valid(f)]
-                if exact_matches:
-                    return exact_matches[0]
+class EFT_OT_auto_texture_principled(bpy.types.Operator):
+    bl_idname = "object.auto_texture_principled"
+    bl_label = "Auto Texture (Principled)"
+    bl_options = {'REGISTER', 'UNDO'}
 
-                # --- Fallback: choose closest matching texture ---
-                def score(f):
-                    name_no_ext = os.path.splitext(f)[0].lower()
-                    if "lod1" in name_no_ext:
-                        return -1
-                    if not any(k in name_no_ext for k in type_keywords):
-                        return -1
-                    return len(os.path.commonprefix([expected_base, name_no_ext]))
+    purge_duplicates: bpy.props.BoolProperty(
+        name="Purge Duplicates",
+        description="Merge duplicate images left over from earlier runs first",
+        default=False
+    )
 
-                fallback_matches = sorted(files, key=score, reverse=True)
-                best = fallback_matches[0] if fallback_matches and score(fallback_matches[0]) > 0 else None
+    def execute(self, context):
+        if self.purge_duplicates:
+            purge_duplicate_images()
+        images = auto_texture_objects(context.selected_objects, context, 'PRINCIPLED', report=self.report)
 
-                if best:
-                    print(f"[Fallback Texture] {obj_name} → {best}")
+        self.report({'INFO'}, f"Loaded {images.loaded} images, reused {images.reused}")
+        return {'FINISHED'}
 
-                return best
 
 
-            diff  = find_texture(obj.name, files, ["_diff"])
-            gloss = find_texture(obj.name, files, ["_gloss", "_glos", "_spec"])
-            norm  = find_texture(obj.name, files, ["_nrm", "_normal"])
+# --- GLOSS BAKE HELPERS ---
+def iter_gloss_setups(objects):
+    # Yields (material, gloss image node, invert node) for every gloss -> invert
+    # chain built by the Principled auto-texture operator
+    for obj in objects:
+        if obj.type != 'MESH' or "_LOD0" not in obj.name:
+            continue
+        for slot in obj.material_slots:
+            mat = slot.material
+            if not mat or not mat.use_nodes:
+                continue
+            nt = mat.node_tree
 
+            # Find the invert node that’s fed by gloss image
+            inv_link = next((
+                l for l in nt.links
+                if isinstance(l.to_node, bpy.types.ShaderNodeInvert)
+                and l.to_socket.name == "Color"
+            ), None)
 
-            mat = obj.active_material or bpy.data.materials.new(name=f"{obj.name}_Mat")
-            mat.use_nodes = True
-            nodes = mat.node_tree.nodes
-            links = mat.node_tree.links
-            nodes.clear()
+            if not inv_link:
+                continue
 
-            out = nodes.new("ShaderNodeGroup")
-            out.node_tree = shader_group
+            gloss_node = inv_link.from_node
+            if not getattr(gloss_node, "image", None):
+                continue
+            yield mat, gloss_node, inv_link.to_node
+
+
+def roughness_path(gloss_img):
+    # Derive the output path next to the gloss image
+    gloss_path = bpy.path.abspath(gloss_img.filepath_raw)
+    gloss_dir = os.path.dirname(gloss_path)
+    gloss_basename = os.path.splitext(os.path.basename(gloss_path))[0]
+    return gloss_path, os.path.join(gloss_dir, f"{gloss_basename}_rough.png")
+
+
+@timed
+def bake_gloss_image(gloss_img, dst):
+    import numpy as np
+    from . import gloss_bake
+
+    # Copy the image to start
+    rough = gloss_img.copy()
+    rough.colorspace_settings.name = 'Non-Color'
+
+    # Convert on float32 buffers instead of boxed Python floats
+    w, h = gloss_img.size
+    orig = np.empty(w * h * gloss_img.channels, dtype=np.float32)
+    gloss_img.pixels.foreach_get(orig)
+    outp = gloss_bake.gloss_to_roughness(orig, gloss_img.channels)
+
+    rough.pixels.foreach_set(outp)
+    rough.filepath_raw = dst
+    rough.file_format = 'PNG'
+    rough.save()
+    print(f"[EFT Bake] wrote → {dst}")
+    return rough
+
+
+def link_roughness(nt, gloss_node, inv_node, rough):
+    # Hook into Principled.Roughness
+    pbsdf = next((
+        n for n in nt.nodes
+        if isinstance(n, bpy.types.ShaderNodeBsdfPrincipled)
+    ), None)
+
+    if pbsdf:
+        tex = nt.nodes.new('ShaderNodeTexImage')
+        tex.image = rough
+        tex.image.colorspace_settings.name = 'Non-Color'
+        nt.links.new(tex.outputs['Color'], pbsdf.inputs['Roughness'])
+
+    # Clean up old gloss + invert nodes
+    nt.nodes.remove(gloss_node)
+    nt.nodes.remove(inv_node)
+
+
+# Worker processes run plain Python without bpy, so they can't run this
+# package's __init__. Before any task is unpickled, each worker registers
+# empty package modules pointing at the add-on folder; gloss_bake (and the
+# fileio it imports) then load under their package-qualified names, and
+# the add-on folder never goes on anyone's sys.path.
+WORKER_BOOTSTRAP = """
+import sys, types
+parts = package.split(".")
+for i in range(len(parts)):
+    name = ".".join(parts[:i + 1])
+    if name not in sys.modules:
+        sys.modules[name] = types.ModuleType(name)
+        sys.modules[name].__path__ = [path] if name == package else []
+"""
+
+
+def worker_initializer():
+    # (initializer, initargs) for the bake ProcessPoolExecutor; exec is a
+    # builtin, so it pickles by reference without importing anything of ours
+    return exec, (WORKER_BOOTSTRAP, {"package": __package__, "path": os.path.dirname(__file__)})
 
-            def load_tex(fn, label, cs, in_c, in_a=None):
-                path = os.path.join(tex_folder, fn) if fn else None
-                if path and os.path.exists(path):
-                    tn = nodes.new("ShaderNodeTexImage")
-                    tn.label = label
-                    tn.image = bpy.data.images.load(path)
-                    tn.image.colorspace_settings.name = cs
-                    links.new(tn.outputs['Color'], out.inputs[in_c])
-                    if in_a:
-                        links.new(tn.outputs['Alpha'], out.inputs[in_a])
 
-            load_tex(diff,  "Diffuse",   'sRGB',      'Diffuse Color',  'Diffuse Alpha')
-            load_tex(gloss, "Glossiness",'sRGB',      'Glossiness Color','Glossiness Alpha')
+class EFT_OT_auto_bake_gloss(bpy.types.Operator):
+    bl_idname = "object.auto_bake_gloss"
+    bl_label = "Auto‑Bake Gloss → Roughness"
+    bl_options = {'REGISTER', 'UNDO'}
 
-            if norm:
-                tn = nodes.new("ShaderNodeTexImage")
-                tn.label = "Normal"
-                tn.image = bpy.data.images.load(os.path.join(tex_folder, norm))
-                tn.image.colorspace_settings.name = 'Non-Color'
-                links.new(tn.outputs['Color'], out.inputs['Red Normal Color'])
+    def execute(self, context):
+        for mat, gloss_node, inv_node in list(iter_gloss_setups(context.selected_objects)):
+            gloss_path, dst = roughness_path(gloss_node.image)
+            if os.path.exists(dst):
+                print(f"[EFT Bake] {os.path.basename(dst)} already exists, skipping.")
+                continue
 
-            out_node = nodes.new("ShaderNodeOutputMaterial")
-            links.new(out.outputs['BSDF'], out_node.inputs['Surface'])
-            obj.active_material = mat
+            rough = bake_gloss_image(gloss_node.image, dst)
+            link_roughness(mat.node_tree, gloss_node, inv_node, rough)
 
+        self.report({'INFO'}, f"Baked roughness maps next to original gloss maps.")
         return {'FINISHED'}
 
 
+class EFT_OT_batch_bake_gloss(bpy.types.Operator):
+    bl_idname = "object.batch_bake_gloss"
+    bl_label = "Batch Bake Gloss → Roughness"
+    bl_description = (
+        "Bake every gloss map in the selection in parallel worker processes, "
+        "then relink the results. Esc cancels"
+    )
+    bl_options = {'REGISTER', 'UNDO'}
 
+    workers: bpy.props.IntProperty(
+        name="Workers",
+        description="Worker processes (0 = one per core, minus one)",
+        default=0, min=0
+    )
 
-class EFT_OT_auto_texture_principled(bpy.types.Operator):
-    bl_idname = "object.auto_texture_principled"
-    bl_label = "Auto Texture (Principled)"
-    bl_options = {'REGISTER', 'UNDO'}
+    def invoke(self, context, event):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from . import gloss_bake
+
+        # Stage 1: collect gloss images across the selection, deduplicated by file
+        jobs = {}
+        for mat, gloss_node, inv_node in iter_gloss_setups(context.selected_objects):
+            gloss_path, dst = roughness_path(gloss_node.image)
+            key = image_key(gloss_path)
+            job = jobs.get(key)
+            if job is None:
+                job = jobs[key] = {
+                    "src": gloss_path,
+                    "dst": dst,
+                    "image": gloss_node.image.name,
+                    "targets": [],
+                    "done": os.path.exists(dst),
+                }
+            job["targets"].append((mat.name, gloss_node.name, inv_node.name))
+
+        if not jobs:
+            self.report({'WARNING'}, "No gloss maps found in selection")
+            return {'CANCELLED'}
 
-    def execute(self, context):
-        for obj in context.selected_objects:
-            if obj.type != 'MESH' or "_LOD0" not in obj.name:
+        self._gloss_bake = gloss_bake
+        self._jobs = list(jobs.values())
+        self._pending = [j for j in self._jobs if not j["done"]]
+        self._running = {}
+        self._failed = []
+        self._total = len(self._pending)
+        self._finished = 0
+        self._start = time.perf_counter()
+        self._use_files = gloss_bake.has_fast_decoder()
+
+        # Stage 2: convert outside the main thread. "spawn" avoids forking Blender.
+        max_workers = self.workers or max(1, (os.cpu_count() or 2) - 1)
+        self._max_inflight = max_workers * 2
+        initializer, initargs = worker_initializer()
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=initializer, initargs=initargs,
+        )
+
+        wm = context.window_manager
+        wm.progress_begin(0, max(1, self._total))
+        self._timer = wm.event_timer_add(0.1, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.cancel(context)
+            self.report({'WARNING'}, f"Batch bake cancelled after {self._finished}/{self._total} maps")
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        self._submit()
+        self._collect()
+        context.window_manager.progress_update(self._finished)
+        context.workspace.status_text_set(
+            f"EFT batch bake: {self._finished}/{self._total} maps (Esc to cancel)"
+        )
+
+        if self._pending or self._running:
+            return {'PASS_THROUGH'}
+
+        self._cleanup(context)
+        relinked = self._relink()
+        elapsed = time.perf_counter() - self._start
+        self.report(
+            {'INFO'},
+            f"Baked {self._total - len(self._failed)} maps in {elapsed:.1f}s, relinked {relinked} materials"
+        )
+        return {'FINISHED'}
+
+    def cancel(self, context):
+        for future in self._running:
+            future.cancel()
+        self._cleanup(context)
+
+    def _submit(self):
+        while self._pending and len(self._running) < self._max_inflight:
+            job = self._pending.pop(0)
+            shm = None
+            try:
+                if self._use_files and job["src"].lower().endswith(".png"):
+                    future = self._executor.submit(self._gloss_bake.convert_file, job["src"], job["dst"])
+                else:
+                    shm, shape, dtype, has_alpha = self._gloss_bake.share_image_planes(
+                        bpy.data.images[job["image"]]
+                    )
+                    future = self._executor.submit(
+                        self._gloss_bake.convert_shared, shm.name, shape, dtype, has_alpha, job["dst"]
+                    )
+            except Exception as e:
+                print(f"[EFT Bake] could not queue {job['src']}: {e}")
+                if shm:
+                    shm.close()
+                    shm.unlink()
+                self._failed.append(job)
+                self._finished += 1
+                continue
+            self._running[future] = (job, shm)
+
+    def _collect(self):
+        for future in [f for f in self._running if f.done()]:
+            job, shm = self._running.pop(future)
+            if shm:
+                shm.close()
+                shm.unlink()
+            try:
+                result = future.result()
+                job["done"] = True
+                print(f"[EFT Bake] wrote → {result['dst']} ({result['seconds']:.2f}s)")
+            except Exception as e:
+                print(f"[EFT Bake] worker failed on {job['src']}: {e}")
+                self._failed.append(job)
+            self._finished += 1
+
+    def _cleanup(self, context):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for job, shm in self._running.values():
+            if shm:
+                shm.close()
+                shm.unlink()
+        self._running = {}
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+
+    def _relink(self):
+        # Stage 3: back on the main thread, convert anything the workers could
+        # not handle and swap the gloss/invert nodes for the roughness maps
+        images = ImageCache()
+        relinked = 0
+        for job in self._jobs:
+            rough = None
+            if not job["done"] and job in self._failed:
+                gloss_img = bpy.data.images.get(job["image"])
+                if gloss_img:
+                    rough = bake_gloss_image(gloss_img, job["dst"])
+                    job["done"] = True
+            if not job["done"]:
                 continue
+            if rough is None:
+                rough = images.load(job["dst"])
+            rough.colorspace_settings.name = 'Non-Color'
+
+            for mat_name, gloss_name, inv_name in job["targets"]:
+                mat = bpy.data.materials.get(mat_name)
+                nt = mat.node_tree if mat else None
+                gloss_node = nt.nodes.get(gloss_name) if nt else None
+                inv_node = nt.nodes.get(inv_name) if nt else None
+                if gloss_node and inv_node:
+                    link_roughness(nt, gloss_node, inv_node, rough)
+                    relinked += 1
+        return relinked
+
+
+# --- BUILD PRESETS ---
+@timed
+def finish_imports(context, results, texture_mode, report=None):
+    # Build bones (one pass for every file) and materials for raw FBX imports
+    # in `results`; cached entries and linked duplicates are already done.
+    # Returns {path: [top-level object per import, in order]}.
+    tops = {}
+    raw = []
+    for path, _, objects in results:
+        top = next((o for o in objects if not o.parent and o.type in ('EMPTY', 'ARMATURE')), None)
+        if top is None:
+            continue
+        entries = tops.setdefault(path, [])
+        if top.type == 'EMPTY':
+            raw.append((path, len(entries), top.name))
+        entries.append(top)
+
+    if raw:
+        armatures = convert_empty_roots_to_armatures([name for _, _, name in raw], report)
+        for (path, pos, _), armature in zip(raw, armatures):
+            tops[path][pos] = armature
+
+        if texture_mode != 'NONE':
+            objects = []
+            for armature in armatures:
+                if armature:
+                    collect_hierarchy(armature, objects)
+            auto_texture_objects(objects, context, texture_mode, report=report)
+    return tops
+
+
+def capture_preset(context):
+    sc = context.scene
+    p = sc.eft_props
+    preset = {
+        "version": presets.PRESET_VERSION,
+        "weapon": p.selected_weapon if p.selected_weapon != "NONE" else None,
+        "weapon_type": p.weapon_type or "NONE",
+        "texture_mode": p.texture_mode,
+        "use_tail": p.use_tail,
+        "mods": [],
+    }
 
-            tex_folder = find_texture_folder_for(obj, context)
-            if not tex_folder:
-                self.report({'WARNING'}, f"No texture folder found for {obj.name}")
+    # A built weapon (active armature) is recorded with its attachments;
+    # otherwise the current dropdown selections are saved for Auto Attach
+    weapon = context.active_object if context.active_object and context.active_object.type == 'ARMATURE' else None
+    if weapon:
+        index = {}
+        for arm in armature_tree(weapon):
+            if arm == weapon:
+                continue
+            name = presets.clean_name(arm.name)
+            category = mod_category(arm.name)
+            if not category:
+                print(f"[EFT Preset] skipping {arm.name}: unknown category")
                 continue
+            parent = arm.parent
+            attached = (
+                parent is not None and arm.parent_type == 'BONE'
+                and (parent == weapon or parent.name in index)
+            )
+            index[arm.name] = len(preset["mods"])
+            preset["mods"].append({
+                "category": category,
+                "name": name,
+                "parent": index.get(parent.name) if attached else None,
+                "bone": arm.parent_bone if attached else None,
+            })
+    if not preset["mods"]:
+        categories = (
+            weapon_compat_data.get(p.weapon_type, {})
+            if p.weapon_type and p.weapon_type != 'NONE'
+            else weapon_mod_data
+        )
+        for cat in categories:
+            sel = getattr(sc, f"mod_{cat}", "NONE")
+            if sel not in (None, 'NONE'):
+                preset["mods"].append({"category": cat, "name": sel, "parent": None, "bone": None})
+    return preset
 
-            files = os.listdir(tex_folder)
-            base_name = obj.name.rsplit("_LOD0", 1)[0].lower()
-
-            def find_texture(obj_name, files, type_keywords):
-                # Normalize name (remove .001, .002)
-                clean_name = re.sub(r'\.\d{3}$', '', obj_name.lower())
-
-                # Match base ending with _lod0
-                match = re.match(r"(.*_lod0)", clean_name)
-                if not match:
-                    return None
-                expected_base = match.group(1)
-
-                def is_valid(f):
-                    name_no_ext = os.path.splitext(f)[0].lower()
-                    return (
-                        "lod1" not in name_no_ext and
-                        name_no_ext.startswith(expected_base) and
-                        any(k in name_no_ext for k in type_keywords)
-                    )
 
-                exact_matches = [f for f in files if is_valid(f)]
-                if exact_matches:
-                    return exact_matches[0]
-
-                # --- Fallback: choose closest matching texture ---
-                def score(f):
-                    name_no_ext = os.path.splitext(f)[0].lower()
-                    if "lod1" in name_no_ext:
-                        return -1
-                    if not any(k in name_no_ext for k in type_keywords):
-                        return -1
-                    return len(os.path.commonprefix([expected_base, name_no_ext]))
-
-                fallback_matches = sorted(files, key=score, reverse=True)
-                best = fallback_matches[0] if fallback_matches and score(fallback_matches[0]) > 0 else None
-
-                if best:
-                    print(f"[Fallback Texture] {obj_name} → {best}")
-
-                return best
-
-            diff  = find_texture(obj.name, files, ["_diff"])
-            gloss = find_texture(obj.name, files, ["_gloss", "_glos", "_spec"])
-            norm  = find_texture(obj.name, files, ["_nrm", "_normal"])
-
-            mat = obj.active_material or bpy.data.materials.new(name=f"{obj.name}_Mat")
-            mat.use_nodes = True
-            nodes = mat.node_tree.nodes
-            links = mat.node_tree.links
-            nodes.clear()
-
-            output = nodes.new("ShaderNodeOutputMaterial")
-            principled = nodes.new("ShaderNodeBsdfPrincipled")
-            principled.location = (300, 0)
-            principled.inputs['IOR'].default_value = 1.45
-
-            invert = nodes.new("ShaderNodeInvert")
-            invert.location = (0, -150)
-            normal_map = nodes.new("ShaderNodeNormalMap")
-            normal_map.location = (0, -300)
-
-            links.new(principled.outputs["BSDF"], output.inputs["Surface"])
-
-            def load_tex(fn, label, cs):
-                if not fn:
-                    return None
-                path = os.path.join(tex_folder, fn)
-                if os.path.exists(path):
-                    tex = nodes.new("ShaderNodeTexImage")
-                    tex.label = label
-                    tex.image = bpy.data.images.load(path)
-                    tex.image.colorspace_settings.name = cs
-                    return tex
-                return None
-
-            tex_diff = load_tex(diff, "Base Color", "sRGB")
-            tex_gloss = load_tex(gloss, "Gloss", "sRGB")
-            tex_norm = load_tex(norm, "Normal", "Non-Color")
-
-            if tex_diff:
-                links.new(tex_diff.outputs["Color"], principled.inputs["Base Color"])
-                if "Alpha" in tex_diff.outputs:
-                    links.new(tex_diff.outputs["Alpha"], principled.inputs["Specular IOR Level"])
-
-            if tex_gloss:
-                links.new(tex_gloss.outputs["Color"], invert.inputs["Color"])
-                links.new(invert.outputs["Color"], principled.inputs["Roughness"])
-                if "Alpha" in tex_gloss.outputs:
-                    links.new(tex_gloss.outputs["Alpha"], principled.inputs["Alpha"])
-
-            if tex_norm:
-                links.new(tex_norm.outputs["Color"], normal_map.inputs["Color"])
-                links.new(normal_map.outputs["Normal"], principled.inputs["Normal"])
-
-            obj.active_material = mat
+@timed
+def replay_preset(context, preset, report=None):
+    # Import, build, texture and attach a whole preset. Returns a summary dict.
+    sc = context.scene
+    p = sc.eft_props
+    warn = report or (lambda level, msg: print(f"[EFT Preset] {msg}"))
+    start = time.perf_counter()
 
-        return {'FINISHED'}
+    p.texture_mode = preset.get("texture_mode", "EFT")
+    p.use_tail = preset.get("use_tail", True)
+    try:
+        p.weapon_type = preset.get("weapon_type", "NONE")
+    except TypeError:
+        warn({'WARNING'}, f"Unknown weapon type '{preset.get('weapon_type')}'")
+    if preset.get("weapon"):
+        p.selected_weapon = preset["weapon"]
+    for mod in preset["mods"]:
+        try:
+            setattr(sc, f"mod_{mod['category']}", mod["name"])
+        except (TypeError, AttributeError):
+            pass
 
+    weapons_root = bpy.path.abspath(p.weapons_folder)
+    mods_root = bpy.path.abspath(p.mods_folder)
+    weapon_path = presets.weapon_fbx_path(weapons_root, preset["weapon"]) if preset.get("weapon") else None
+    mod_paths = [presets.mod_fbx_path(mods_root, m["category"], m["name"]) for m in preset["mods"]]
 
+    paths = []
+    for path in [weapon_path] + mod_paths:
+        if not path:
+            continue
+        if os.path.exists(path):
+            paths.append(path)
+        else:
+            warn({'WARNING'}, f"Missing {path}")
+
+    results, hits, linked = import_mod_files(context, paths, report)
+    tops = finish_imports(context, results, p.texture_mode, report)
+
+    def take(path):
+        found = tops.get(path)
+        return found.pop(0) if found else None
+    weapon = take(weapon_path) if weapon_path else None
+    arms = [take(path) for path in mod_paths]
+
+    # Recorded attachments, parents before children
+    attached = set()
+    pending = [i for i, m in enumerate(preset["mods"]) if m.get("bone") and arms[i]]
+    while pending:
+        ready = [
+            i for i in pending
+            if (preset["mods"][i].get("parent") is None and weapon)
+            or preset["mods"][i].get("parent") in attached
+        ]
+        if not ready:
+            break
+        context.view_layer.update()
+        for i in ready:
+            mod = preset["mods"][i]
+            target = weapon if mod.get("parent") is None else arms[mod["parent"]]
+            if attach_mod_to_bone(arms[i], target, mod["bone"], p.use_tail):
+                attached.add(i)
+            else:
+                warn({'WARNING'}, f"Bone '{mod['bone']}' not found on '{target.name}'")
+        pending = [i for i in pending if i not in ready]
+
+    # Everything else goes through Auto Attach
+    leftovers = [a for i, a in enumerate(arms) if a and i not in attached]
+    auto = 0
+    if weapon and leftovers:
+        context.view_layer.update()
+        plan, _ = auto_attach_mods(context, weapon, leftovers, p.use_tail)
+        auto = len(plan)
+
+    summary = {
+        "imported": len(results),
+        "cache_hits": hits,
+        "linked": linked,
+        "attached": len(attached),
+        "auto_attached": auto,
+        "seconds": time.perf_counter() - start,
+    }
+    print(f"[EFT Preset] {summary}")
+    return summary
 
-class EFT_OT_auto_bake_gloss(bpy.types.Operator):
-    bl_idname = "object.auto_bake_gloss"
-    bl_label = "Auto‑Bake Gloss → Roughness"
+
+class EFT_OT_save_preset(bpy.types.Operator):
+    bl_idname = "object.save_build_preset"
+    bl_label = "Save Build Preset"
+    bl_description = "Save the weapon, mods, bone targets and texture mode of the active weapon armature"
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    filter_glob: bpy.props.StringProperty(default="*.json", options={'HIDDEN'})
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = "build_preset.json"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        preset = capture_preset(context)
+        try:
+            presets.save_preset(bpy.path.ensure_ext(self.filepath, ".json"), preset)
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, f"Could not save preset: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Saved preset with {len(preset['mods'])} mods")
+        return {'FINISHED'}
+
+
+class EFT_OT_load_preset(bpy.types.Operator):
+    bl_idname = "object.load_build_preset"
+    bl_label = "Load Build Preset"
+    bl_description = "Import, texture and attach everything in a build preset"
     bl_options = {'REGISTER', 'UNDO'}
 
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    filter_glob: bpy.props.StringProperty(default="*.json", options={'HIDDEN'})
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
     def execute(self, context):
-        import os
+        try:
+            preset = presets.load_preset(self.filepath)
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, f"Could not load preset: {e}")
+            return {'CANCELLED'}
+        try:
+            summary = replay_preset(context, preset, self.report)
+        except Exception as e:
+            self.report({'ERROR'}, f"Could not build preset: {e}")
+            return {'CANCELLED'}
+        self.report(
+            {'INFO'},
+            f"Built {summary['imported']} parts in {summary['seconds']:.2f}s "
+            f"({summary['attached'] + summary['auto_attached']} attached)"
+        )
+        return {'FINISHED'}
 
-        def srgb_to_linear(c):
-            if c <= 0.04045:
-                return c / 12.92
-            else:
-                return ((c + 0.055) / 1.055) ** 2.4
 
-        for obj in context.selected_objects:
-            if obj.type != 'MESH' or "_LOD0" not in obj.name:
-                continue
-            bpy.context.view_layer.objects.active = obj
-
-            for slot in obj.material_slots:
-                mat = slot.material
-                if not mat or not mat.use_nodes:
-                    continue
-                nt = mat.node_tree
-
-                # Find the invert node that’s fed by gloss image
-                inv_link = next((
-                    l for l in nt.links
-                    if isinstance(l.to_node, bpy.types.ShaderNodeInvert)
-                    and l.to_socket.name == "Color"
-                ), None)
-
-                if not inv_link:
-                    continue
-
-                gloss_node = inv_link.from_node
-                gloss_img = gloss_node.image
-                if not gloss_img:
-                    continue
-
-                # Derive the output folder from the gloss image path
-                gloss_path = bpy.path.abspath(gloss_img.filepath_raw)
-                gloss_dir = os.path.dirname(gloss_path)
-                gloss_basename = os.path.splitext(os.path.basename(gloss_path))[0]
-
-                # Build the output path
-                baked_name = f"{gloss_basename}_rough.png"
-                dst = os.path.join(gloss_dir, baked_name)
-
-                if os.path.exists(dst):
-                    print(f"[EFT Bake] {baked_name} already exists, skipping.")
-                    continue
-
-                # Copy the image to start
-                rough = gloss_img.copy()
-                rough.colorspace_settings.name = 'Non-Color'
-
-                orig = list(gloss_img.pixels)
-                outp = []
-
-                for i in range(0, len(orig), 4):
-                    sr = orig[i]
-                    lr = srgb_to_linear(sr)
-                    inv = 1.0 - lr
-                    outp.extend([inv, inv, inv, orig[i+3]])
-
-                rough.pixels[:] = outp
-                rough.filepath_raw = dst
-                rough.file_format = 'PNG'
-                rough.save()
-
-                print(f"[EFT Bake] wrote → {dst}")
-                # Hook into Principled.Roughness
-                pbsdf = next((
-                    n for n in nt.nodes
-                    if isinstance(n, bpy.types.ShaderNodeBsdfPrincipled)
-                ), None)
-
-                if pbsdf:
-                    tex = nt.nodes.new('ShaderNodeTexImage')
-                    tex.image = rough
-                    tex.image.colorspace_settings.name = 'Non-Color'
-                    nt.links.new(tex.outputs['Color'], pbsdf.inputs['Roughness'])
-
-                # Clean up old gloss + invert nodes
-                nt.nodes.remove(gloss_node)
-                nt.nodes.remove(inv_link.to_node)
+# --- PROFILER ---
+class EFT_OT_export_profile(bpy.types.Operator):
+    bl_idname = "object.export_eft_profile"
+    bl_label = "Export Profile"
+    bl_description = "Write the recorded runs as a Chrome trace (chrome://tracing, Perfetto) with per-run summaries"
 
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    filter_glob: bpy.props.StringProperty(default="*.json", options={'HIDDEN'})
 
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = "eft_profile.json"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
 
-        self.report({'INFO'}, f"Baked roughness maps next to original gloss maps.")
+    def execute(self, context):
+        if not profiler.recorder.runs:
+            self.report({'WARNING'}, "No runs recorded")
+            return {'CANCELLED'}
+        try:
+            count = profiler.recorder.export(bpy.path.ensure_ext(self.filepath, ".json"))
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not export profile: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Exported {count} runs")
         return {'FINISHED'}
 
 
+class EFT_OT_print_profile(bpy.types.Operator):
+    bl_idname = "object.print_eft_profile"
+    bl_label = "Print Profile"
+    bl_description = "Print every recorded run with its helper calls, files and cProfile summary to the console"
+
+    def execute(self, context):
+        for run in profiler.recorder.runs:
+            print(f"[EFT Profile] {run.describe()} ({run.result})")
+            for name, (count, seconds) in sorted(run.calls.items(), key=lambda kv: kv[1][1], reverse=True):
+                print(f"    {name:<40} {count:>6}x {seconds:9.3f}s")
+            for path, size in sorted(run.files.items()):
+                print(f"    {size:>12} B  {path}")
+            if run.stats:
+                print(run.stats)
+        self.report({'INFO'}, f"Printed {len(profiler.recorder.runs)} runs to the console")
+        return {'FINISHED'}
+
+
+class EFT_OT_clear_profile(bpy.types.Operator):
+    bl_idname = "object.clear_eft_profile"
+    bl_label = "Clear Profile"
+    bl_description = "Forget the recorded runs"
+
+    def execute(self, context):
+        profiler.recorder.clear()
+        return {'FINISHED'}
 
 
 class EFT_PT_panel(bpy.types.Panel):
@@ -950,6 +2058,8 @@ class EFT_PT_panel(bpy.types.Panel):
     def draw(self, context):
         l = self.layout
         p = context.scene.eft_props
+        if restore_pending:
+            restore_libraries(context.scene)
 
         l.operator("object.refresh_bone_list")
         l.prop(p, "bone_list")
@@ -957,6 +2067,7 @@ class EFT_PT_panel(bpy.types.Panel):
         row.prop(p, "use_tail")
         row.operator("object.set_bone_display_stick", text="", icon='ARMATURE_DATA')
         l.operator("object.attach_eft_mod")
+        l.operator("object.auto_attach_mods")
 
         l.separator()
         row = l.row(align=True)
@@ -965,6 +2076,8 @@ class EFT_PT_panel(bpy.types.Panel):
         l.operator("object.import_selected_weapon", text="Import Selected Weapon")
         l.prop(p, "weapons_folder")
         l.prop(p, "mods_folder")
+        for text in scan_status.values():
+            l.label(text=text, icon='TIME')
         l.prop(p, "weapon_type")
         l.prop(p, "filter_text")
 
@@ -979,12 +2092,57 @@ class EFT_PT_panel(bpy.types.Panel):
                 l.prop(context.scene, prop)
 
         l.operator("object.import_all_mods")
+        l.prop(p, "import_mode")
+        row = l.row(align=True)
+        row.prop(p, "use_asset_cache")
+        row.operator("object.clear_asset_cache", text="", icon='TRASH')
+        if p.use_asset_cache:
+            l.prop(p, "texture_mode")
+            l.prop(p, "asset_cache_dir")
+            l.prop(p, "asset_cache_budget_mb")
         l.operator("object.reset_mod_selection", text="Reset Mod Selection")
+        row = l.row(align=True)
+        row.operator("object.save_build_preset", text="Save Preset", icon='EXPORT')
+        row.operator("object.load_build_preset", text="Load Preset", icon='IMPORT')
         l.separator()
         l.operator("object.build_eft_bones", text="Build Bones from Empties")
         l.operator("object.auto_texture", text="Auto Texture (EFT Shader)")
         l.operator("object.auto_texture_principled", text="Auto Texture (Principled)")
         l.operator("object.auto_bake_gloss", text="Auto‑Bake Gloss→Roughness")
+        l.operator("object.batch_bake_gloss", text="Batch Bake Gloss→Roughness")
+        l.operator("object.purge_duplicate_images", text="Purge Duplicate Images")
+
+
+class EFT_PT_profiler(bpy.types.Panel):
+    bl_label = "Profiler"
+    bl_idname = "EFT_PT_profiler"
+    bl_parent_id = "EFT_PT_weapon_mod_panel"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'EFT Mod Tool'
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        l = self.layout
+        p = context.scene.eft_props
+        row = l.row(align=True)
+        row.prop(p, "profile_enabled")
+        row.prop(p, "profile_cprofile")
+        l.prop(p, "profile_runs")
+
+        runs = profiler.recorder.runs
+        if not runs:
+            l.label(text="No runs recorded")
+        for run in reversed(runs):
+            col = l.box().column(align=True)
+            col.label(text=run.describe(), icon='TIME')
+            for name, (count, seconds) in run.top_calls():
+                col.label(text=f"    {name} ×{count}: {seconds:.2f}s")
+
+        row = l.row(align=True)
+        row.operator("object.print_eft_profile", text="Print", icon='CONSOLE')
+        row.operator("object.export_eft_profile", text="Export", icon='EXPORT')
+        row.operator("object.clear_eft_profile", text="", icon='TRASH')
 
 
 classes = (
@@ -992,36 +2150,69 @@ classes = (
     EFT_OT_build_bones,
     EFT_OT_refresh_bone_list,
     EFT_OT_open_weapon_browser,
-    EFT_MT_weapon_menu,
-    EFT_OT_select_weapon,
     EFT_OT_attach_mod,
+    EFT_OT_auto_attach_mods,
     EFT_OT_import_selected_weapon,
     EFT_OT_import_mods,
     EFT_OT_auto_texture,
     EFT_OT_auto_texture_principled,
     EFT_OT_auto_bake_gloss,
+    EFT_OT_batch_bake_gloss,
+    EFT_OT_purge_duplicate_images,
+    EFT_OT_clear_asset_cache,
+    EFT_OT_save_preset,
+    EFT_OT_load_preset,
     EFT_OT_reset_mod_selection,
     EFT_OT_set_bone_display_stick,
+    EFT_OT_export_profile,
+    EFT_OT_print_profile,
+    EFT_OT_clear_profile,
     EFT_PT_panel,
+    EFT_PT_profiler,
+)
+
+# Operators wrapped by the profiler (not the profiler's own)
+profiled_classes = tuple(
+    cls for cls in classes
+    if issubclass(cls, bpy.types.Operator)
+    and cls not in (EFT_OT_export_profile, EFT_OT_print_profile, EFT_OT_clear_profile)
 )
 
 
 def register():
-    clear_mod_props()
+    # No disk access here: libraries are restored on the first panel draw and
+    # the EFT shader is appended by the operators that need it
+    for cls in profiled_classes:
+        profiler.instrument(cls)
     for cls in classes:
         bpy.utils.register_class(cls)
     bpy.types.Scene.eft_props = bpy.props.PointerProperty(type=EFTProperties)
 
-    # Delay shader load to avoid _RestrictData error
-    bpy.app.timers.register(ensure_eft_shader_loaded, first_interval=0.5)
-
-    # Also re-load it after opening .blend files
-    if ensure_eft_shader_loaded not in bpy.app.handlers.load_post:
-        bpy.app.handlers.load_post.append(ensure_eft_shader_loaded)
+    if on_load_mark_restore not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(on_load_mark_restore)
+    if on_depsgraph_update not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update)
+    if on_load_reset_bone_index not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(on_load_reset_bone_index)
+    if on_load_apply_profiler not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(on_load_apply_profiler)
 
 
 
 def unregister():
+    for kind in list(scan_tokens):
+        cancel_scan(kind)
+    if bpy.app.timers.is_registered(poll_scans):
+        bpy.app.timers.unregister(poll_scans)
+    if on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update)
+    if on_load_reset_bone_index in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(on_load_reset_bone_index)
+    if on_load_mark_restore in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(on_load_mark_restore)
+    if on_load_apply_profiler in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(on_load_apply_profiler)
+    profiler.recorder.enabled = False
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     clear_mod_props()
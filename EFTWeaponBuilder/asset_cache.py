@@ -0,0 +1,218 @@
+import os
+import re
+import json
+import time
+import hashlib
+
+import bpy
+
+from .fileio import write_json
+from .profiler import recorder, timed
+
+# Local library of already-prepared mods.
+#
+# After its first import a mod (bones built, textured) is written to its own
+# .blend through bpy.data.libraries.write; later imports append from that file
+# instead of running the FBX importer again. Entries are keyed by the FBX path,
+# its mtime and the texture mode, and evicted least-recently-used first once
+# the folder grows past its size budget.
+
+INDEX_FILENAME = "asset_cache.json"
+INDEX_VERSION = 1
+
+
+# Datablocks an entry drags in along with its objects
+SHARED_TYPES = ("materials", "node_groups", "images")
+KEY_PROP = "eft_cache_key"
+
+
+def base_name(name):
+    return re.sub(r"\.\d{3}$", "", name)
+
+
+def image_key(path):
+    return os.path.normcase(os.path.normpath(bpy.path.abspath(path)))
+
+
+def merge_appended(key, before):
+    # Appending also copies every material, node group and image the objects
+    # use, even when the file already has them. Remap the copies this load
+    # created onto the local datablocks they duplicate and remove them:
+    # materials stored from the same entry, node groups of the same name
+    # (the EFT shader) and images of the same file. Nothing else is touched.
+    def local(attr):
+        return [block for block in before[attr] if block.library is None]
+
+    materials = {}
+    for mat in local("materials"):
+        if mat.get(KEY_PROP) == key:
+            materials.setdefault(base_name(mat.name), mat)
+    groups = {group.name: group for group in local("node_groups")}
+    images = {}
+    for img in local("images"):
+        if img.source == 'FILE' and img.filepath:
+            images.setdefault(image_key(img.filepath), img)
+
+    def match(attr, block):
+        if attr == "materials":
+            return materials.get(base_name(block.name)) if block.get(KEY_PROP) == key else None
+        if attr == "node_groups":
+            return groups.get(base_name(block.name))
+        if block.source == 'FILE' and block.filepath:
+            return images.get(image_key(block.filepath))
+        return None
+
+    merged = 0
+    # Materials first, so the node groups and images they held lose those users
+    for attr in SHARED_TYPES:
+        blocks = getattr(bpy.data, attr)
+        for block in set(blocks) - before[attr]:
+            existing = match(attr, block)
+            if existing is not None and existing != block:
+                block.user_remap(existing)
+                blocks.remove(block)
+                merged += 1
+    return merged
+
+
+def default_cache_dir():
+    base = (
+        os.environ.get("LOCALAPPDATA")
+        or os.environ.get("XDG_CACHE_HOME")
+        or os.path.join(os.path.expanduser("~"), ".cache")
+    )
+    return os.path.join(base, "EFTWeaponBuilder", "assets")
+
+
+def normalize(path):
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+
+class AssetCache:
+    def __init__(self, directory, budget_bytes):
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        self.entries = {}
+        self._load_index()
+
+    def index_path(self):
+        return os.path.join(self.directory, INDEX_FILENAME)
+
+    def _load_index(self):
+        try:
+            with open(self.index_path(), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.entries = data.get("entries", {})
+
+    def save(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            write_json(self.index_path(), {"version": INDEX_VERSION, "entries": self.entries}, indent=1)
+        except OSError as e:
+            print(f"[EFT Asset Cache] Could not write index: {e}")
+
+    def key(self, fbx_path, texture_mode):
+        try:
+            mtime = os.stat(fbx_path).st_mtime_ns
+        except OSError:
+            return None
+        raw = f"{normalize(fbx_path)}|{mtime}|{texture_mode}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def blend_path(self, key):
+        return os.path.join(self.directory, f"{key}.blend")
+
+    def lookup(self, fbx_path, texture_mode):
+        key = self.key(fbx_path, texture_mode)
+        if key is None or key not in self.entries:
+            return None
+        if not os.path.exists(self.blend_path(key)):
+            del self.entries[key]
+            return None
+        return key
+
+    @timed
+    def load(self, key, collection):
+        # Append every object of the entry and link it into `collection`
+        recorder.touch(self.blend_path(key))
+        before = {attr: set(getattr(bpy.data, attr)) for attr in SHARED_TYPES}
+        with bpy.data.libraries.load(self.blend_path(key), link=False) as (data_from, data_to):
+            data_to.objects = list(data_from.objects)
+        objects = [o for o in data_to.objects if o is not None]
+        for obj in objects:
+            collection.objects.link(obj)
+        merge_appended(key, before)
+        self.entries[key]["used"] = time.time()
+        return objects
+
+    @timed
+    def store(self, fbx_path, texture_mode, objects):
+        key = self.key(fbx_path, texture_mode)
+        if key is None or not objects:
+            return None
+        path = self.blend_path(key)
+        # Lets later loads of this entry reuse these materials (see merge_appended)
+        for obj in objects:
+            for slot in getattr(obj, "material_slots", ()):
+                if slot.material:
+                    slot.material[KEY_PROP] = key
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Absolute paths so textures resolve from the cache folder
+            bpy.data.libraries.write(path, set(objects), path_remap='ABSOLUTE', fake_user=False)
+            recorder.touch(path, read=False)
+        except (OSError, RuntimeError) as e:
+            print(f"[EFT Asset Cache] Could not store {fbx_path}: {e}")
+            return None
+        self.entries[key] = {
+            "fbx": normalize(fbx_path),
+            "mode": texture_mode,
+            "size": os.path.getsize(path),
+            "used": time.time(),
+        }
+        self.evict()
+        return key
+
+    def total_size(self):
+        return sum(e["size"] for e in self.entries.values())
+
+    def evict(self):
+        total = self.total_size()
+        if total <= self.budget_bytes:
+            return 0
+        removed = 0
+        for key in sorted(self.entries, key=lambda k: self.entries[k]["used"]):
+            if total <= self.budget_bytes:
+                break
+            total -= self.entries.pop(key)["size"]
+            try:
+                os.remove(self.blend_path(key))
+            except OSError:
+                pass
+            removed += 1
+        print(f"[EFT Asset Cache] Evicted {removed} entries, {total / 1e6:.1f} MB in use")
+        return removed
+
+    def clear(self):
+        for key in list(self.entries):
+            try:
+                os.remove(self.blend_path(key))
+            except OSError:
+                pass
+        self.entries = {}
+        self.save()
+
+
+_caches = {}
+
+
+def get_cache(directory=None, budget_mb=2048):
+    directory = normalize(directory or default_cache_dir())
+    cache = _caches.get(directory)
+    if cache is None:
+        cache = _caches[directory] = AssetCache(directory, budget_mb * 1024 * 1024)
+    cache.budget_bytes = budget_mb * 1024 * 1024
+    return cache
@@ -0,0 +1,122 @@
+import re
+
+# Planning for the Auto Attach operator (no bpy, works on names only).
+#
+# Every free `mod_*` bone in the weapon hierarchy is a slot, keyed by its name
+# without the "mod_" prefix and numeric suffix ("mod_scope_001" -> "scope").
+# Mods are matched to slots by category in passes: a mod attached in one pass
+# opens its own `mod_*` bones for the next, so scopes can land on mounts that
+# were just placed. Mods are visited in name order and each takes the
+# shallowest free slot (then armature name, bone name), so a plan is always
+# the same for the same scene.
+
+# Mod category -> slot keys it can occupy
+CATEGORY_SLOTS = {
+    "barrels": ("barrel",),
+    "bipods": ("bipod",),
+    "charges": ("charge",),
+    "foregrips": ("foregrip",),
+    "gasblock": ("gas_block", "gasblock"),
+    "handguards": ("handguard",),
+    "magazines": ("magazine",),
+    "mechanics": ("mechanism", "trigger", "hammer", "catch"),
+    "mounts": ("mount",),
+    "muzzle": ("muzzle",),
+    "pistol grips": ("pistol_grip", "pistolgrip"),
+    "recievers": ("reciever", "receiver"),
+    "scopes": ("scope",),
+    "sights front": ("sight_front",),
+    "sights rear": ("sight_rear",),
+    "silencers": ("muzzle",),
+    "stocks": ("stock",),
+    "tactical": ("tactical",),
+}
+
+# Mod name prefix -> category, for mods the library and compat data don't know
+NAME_PREFIXES = (
+    ("pistolgrip", "pistol grips"),
+    ("sight_front", "sights front"),
+    ("sight_rear", "sights rear"),
+    ("gas_block", "gasblock"),
+    ("gasblock", "gasblock"),
+    ("handguard", "handguards"),
+    ("foregrip", "foregrips"),
+    ("reciever", "recievers"),
+    ("receiver", "recievers"),
+    ("silencer", "silencers"),
+    ("tactical", "tactical"),
+    ("magazine", "magazines"),
+    ("charge", "charges"),
+    ("barrel", "barrels"),
+    ("muzzle", "muzzle"),
+    ("scope", "scopes"),
+    ("stock", "stocks"),
+    ("mount", "mounts"),
+    ("bipod", "bipods"),
+    ("mag", "magazines"),
+)
+
+_SLOT_SUFFIX = re.compile(r"_\d+$")
+
+
+def slot_key(bone_name):
+    return _SLOT_SUFFIX.sub("", bone_name.lower().removeprefix("mod_"))
+
+
+def category_from_name(mod_name):
+    name = mod_name.lower()
+    for prefix, category in NAME_PREFIXES:
+        if name.startswith(prefix):
+            return category
+    return None
+
+
+def fits(category, bone_name):
+    key = slot_key(bone_name)
+    return any(key == k or key.startswith(k + "_") for k in CATEGORY_SLOTS.get(category.lower(), ()))
+
+
+def plan_attachments(slots, mods, mod_bones, category_of):
+    # slots: [(depth, armature name, bone name)] free in the weapon hierarchy
+    # mods: mod armature names to place
+    # mod_bones: {mod armature name: [bone names]}
+    # category_of: mod armature name -> category or None
+    # Returns (plan, unmatched): plan = [(pass, mod, armature, bone)],
+    # unmatched = [(mod, reason)]
+    free = [s for s in slots if s[2].startswith("mod_")]
+    categories = {m: category_of(m) for m in mods}
+    pending = sorted(mods)
+    plan = []
+    pass_no = 0
+
+    while pending:
+        pass_no += 1
+        available = sorted(free)
+        taken = set()
+        placed = {}
+        for mod in pending:
+            category = categories[mod]
+            if not category:
+                continue
+            for slot in available:
+                if slot not in taken and fits(category, slot[2]):
+                    taken.add(slot)
+                    placed[mod] = slot
+                    break
+        if not placed:
+            break
+
+        for mod, (depth, armature, bone) in placed.items():
+            plan.append((pass_no, mod, armature, bone))
+            free.remove((depth, armature, bone))
+            for b in sorted(mod_bones.get(mod, ())):
+                if b.startswith("mod_"):
+                    free.append((depth + 1, mod, b))
+        pending = [m for m in pending if m not in placed]
+
+    unmatched = []
+    for mod in pending:
+        category = categories[mod]
+        reason = f"no free slot for '{category}'" if category else "unknown category"
+        unmatched.append((mod, reason))
+    return plan, unmatched
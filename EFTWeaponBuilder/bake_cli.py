@@ -0,0 +1,210 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+# Headless gloss -> roughness bake for whole mods/weapons libraries.
+#
+#   blender --background --python EFTWeaponBuilder/bake_cli.py -- --mods D:/Mods --weapons D:/Weapons
+#   python EFTWeaponBuilder/bake_cli.py --mods D:/Mods --weapons D:/Weapons
+#
+# Uses the same conversion as the Auto-Bake operators (gloss_bake.py). Inside
+# Blender, images are decoded by Blender and handed to the workers through
+# shared memory; as standalone Python, workers decode PNGs themselves (Pillow
+# when installed). Outputs newer than their source are skipped, and every run
+# merges its results into a JSON manifest.
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+# Worker processes have no bpy and cannot import the add-on package, so the
+# helpers are imported as top-level modules from this folder
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fileio
+import gloss_bake
+import library_index
+from texture_resolver import TEXTURE_ROLES
+
+MANIFEST_FILENAME = "bake_manifest.json"
+
+
+def is_gloss_map(filename):
+    name, ext = os.path.splitext(filename.lower())
+    if ext not in (".png", ".tga", ".tif", ".tiff", ".bmp", ".jpg", ".jpeg"):
+        return False
+    if "lod1" in name or name.endswith("_rough"):
+        return False
+    return any(k in name for k in TEXTURE_ROLES["gloss"])
+
+
+def rough_path(src):
+    return f"{os.path.splitext(src)[0]}_rough.png"
+
+
+def find_gloss_maps(roots):
+    # Walk every library through its persistent index (see library_index.py)
+    for root in roots:
+        index = library_index.get_index(root)
+        for category, entry in index.categories.items():
+            for mod in entry["mods"]:
+                for f in index.files(category, mod):
+                    if is_gloss_map(f):
+                        yield os.path.join(index.mod_path(category, mod), f)
+
+
+def is_up_to_date(src, dst):
+    try:
+        return os.stat(dst).st_mtime_ns >= os.stat(src).st_mtime_ns
+    except OSError:
+        return False
+
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"entries": {}}
+
+
+def save_manifest(path, manifest):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fileio.write_json(path, manifest, indent=1, sort_keys=True)
+
+
+def submit(executor, src, dst):
+    # Returns (future, shared memory block or None)
+    if bpy is None:
+        return executor.submit(gloss_bake.convert_file, src, dst), None
+
+    image = bpy.data.images.load(src, check_existing=False)
+    try:
+        shm, shape, dtype, has_alpha = gloss_bake.share_image_planes(image)
+    finally:
+        bpy.data.images.remove(image)
+    return executor.submit(gloss_bake.convert_shared, shm.name, shape, dtype, has_alpha, dst), shm
+
+
+def run(roots, jobs=0, force=False, dry_run=False, manifest_path=None):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+    roots = [os.path.abspath(r) for r in roots]
+    manifest_path = manifest_path or os.path.join(
+        roots[0], library_index.CACHE_DIRNAME, MANIFEST_FILENAME
+    )
+    manifest = load_manifest(manifest_path)
+    entries = manifest.setdefault("entries", {})
+
+    todo = []
+    skipped = 0
+    for src in find_gloss_maps(roots):
+        dst = rough_path(src)
+        if not force and is_up_to_date(src, dst):
+            skipped += 1
+            continue
+        if bpy is None and not src.lower().endswith(".png"):
+            print(f"[EFT Bake CLI] skipping {src}: only PNG sources are supported outside Blender")
+            skipped += 1
+            continue
+        todo.append((src, dst))
+
+    print(f"[EFT Bake CLI] {len(todo)} maps to convert, {skipped} up to date or skipped")
+    if dry_run or not todo:
+        for src, dst in todo:
+            print(f"  {src} → {dst}")
+        return 0
+
+    workers = jobs or max(1, (os.cpu_count() or 2) - 1)
+    start = time.perf_counter()
+    failed = 0
+    running = {}
+    pending = list(todo)
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as ex:
+        while pending or running:
+            # Keep a bounded number of images in flight to cap shared memory use
+            while pending and len(running) < workers * 2:
+                src, dst = pending.pop(0)
+                try:
+                    future, shm = submit(ex, src, dst)
+                except Exception as e:
+                    print(f"[EFT Bake CLI] failed {src}: {e}")
+                    entries[src] = {"dst": dst, "status": "failed", "error": str(e)}
+                    failed += 1
+                    continue
+                running[future] = (src, dst, shm)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                src, dst, shm = running.pop(future)
+                if shm:
+                    shm.close()
+                    shm.unlink()
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"[EFT Bake CLI] failed {src}: {e}")
+                    entries[src] = {"dst": dst, "status": "failed", "error": str(e)}
+                    failed += 1
+                    continue
+                entries[src] = {
+                    "dst": dst,
+                    "status": "ok",
+                    "src_mtime_ns": os.stat(src).st_mtime_ns,
+                    "seconds": round(result["seconds"], 3),
+                    "bytes_written": result["bytes_written"],
+                }
+                print(f"[EFT Bake CLI] wrote → {dst} ({result['seconds']:.2f}s)")
+
+    elapsed = time.perf_counter() - start
+    manifest["last_run"] = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "roots": roots,
+        "converted": len(todo) - failed,
+        "failed": failed,
+        "skipped": skipped,
+        "seconds": round(elapsed, 2),
+        "workers": workers,
+    }
+    save_manifest(manifest_path, manifest)
+    print(
+        f"[EFT Bake CLI] converted {len(todo) - failed}, failed {failed} in {elapsed:.1f}s "
+        f"using {workers} workers; manifest: {manifest_path}"
+    )
+    return 1 if failed else 0
+
+
+def parse_args(argv):
+    argv = fileio.script_args(argv)
+    parser = argparse.ArgumentParser(description="Bake roughness maps for an EFT mod/weapon library")
+    parser.add_argument("--mods", help="Mods folder")
+    parser.add_argument("--weapons", help="Weapons folder")
+    parser.add_argument("--jobs", type=int, default=0, help="Worker processes (default: cores - 1)")
+    parser.add_argument("--force", action="store_true", help="Reconvert even if outputs are up to date")
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be converted")
+    parser.add_argument("--manifest", help="Manifest path (default: <first root>/.eft_cache/bake_manifest.json)")
+    args = parser.parse_args(argv)
+    if not args.mods and not args.weapons:
+        parser.error("give --mods and/or --weapons")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    roots = [r for r in (args.mods, args.weapons) if r]
+    if bpy is None and not args.dry_run and not gloss_bake.has_fast_decoder():
+        print(
+            "[EFT Bake CLI] Pillow is not installed: PNGs are decoded with the built-in "
+            "NumPy decoder, which takes a few seconds per 4K map (pip install pillow)"
+        )
+    return run(roots, args.jobs, args.force, args.dry_run, args.manifest)
+
+
+if __name__ == "__main__":
+    code = main()
+    if bpy is None:
+        sys.exit(code)
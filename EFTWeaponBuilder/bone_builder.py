@@ -0,0 +1,227 @@
+import time
+
+import bpy
+from mathutils import Matrix, Vector
+
+from .profiler import timed
+
+# Empty hierarchy -> armature conversion, done through the data API.
+#
+# Only the root's own hierarchy is visited. The armature is created with
+# bpy.data, bones are added in a single edit-mode session, and mesh origins
+# are moved to their bounds centre by shifting vertex data and compensating
+# the object matrices (the same result as Origin to Geometry / Bounds).
+
+
+def gather_hierarchy(root_empty):
+    # Returns (empties, meshes parented to those empties, LOD1 meshes)
+    empties = []
+    meshes = []
+    lod1 = []
+
+    def walk(obj):
+        empties.append(obj)
+        for child in obj.children:
+            if child.type == 'EMPTY':
+                walk(child)
+            elif child.type == 'MESH':
+                if child.name.endswith('_LOD1'):
+                    lod1.append(child)
+                else:
+                    meshes.append(child)
+    walk(root_empty)
+    return empties, meshes, lod1
+
+
+def new_armature_for(root_empty, collection=None):
+    name = "Armature_" + root_empty.name
+    armature = bpy.data.objects.new(name, bpy.data.armatures.new(name))
+    if collection is None:
+        collection = root_empty.users_collection[0] if root_empty.users_collection else bpy.context.collection
+    collection.objects.link(armature)
+    armature.matrix_world = root_empty.matrix_world.copy()
+    for prop in ("eft_source", "eft_import"):
+        if prop in root_empty:
+            armature[prop] = root_empty[prop]
+    return armature
+
+
+def create_bone_from_empty(empty, ebones, parent_bone=None, armature_matrix_inv=None):
+    head_world = empty.matrix_world.to_translation()
+    head_local = armature_matrix_inv @ head_world
+
+    direction_world = empty.matrix_world.to_quaternion() @ Vector((0, 0.1, 0))
+    tail_world = head_world + direction_world
+    tail_local = armature_matrix_inv @ tail_world
+
+    if (tail_local - head_local).length < 0.001:
+        tail_local = head_local + Vector((0, 0.01, 0))
+
+    bone = ebones.new(empty.name)
+    bone.head = head_local
+    bone.tail = tail_local
+    if parent_bone:
+        bone.parent = parent_bone
+    return bone
+
+
+@timed
+def add_edit_bones(armature, root_empty):
+    # The armature must be in edit mode
+    ebones = armature.data.edit_bones
+    armature_matrix_inv = armature.matrix_world.inverted()
+
+    def add_bones_recursive(empty_obj, parent_bone=None):
+        bone = create_bone_from_empty(empty_obj, ebones, parent_bone, armature_matrix_inv)
+        for child in empty_obj.children:
+            if child.type == 'EMPTY':
+                add_bones_recursive(child, bone)
+    add_bones_recursive(root_empty)
+
+
+def enter_edit_mode(armatures):
+    view_layer = bpy.context.view_layer
+    for obj in list(view_layer.objects.selected):
+        obj.select_set(False)
+    for armature in armatures:
+        armature.select_set(True)
+    view_layer.objects.active = armatures[0]
+    bpy.ops.object.mode_set(mode='EDIT')
+
+
+def exit_edit_mode():
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+
+def _shift_coords(collection, offset, count):
+    import numpy as np
+    co = np.empty(count * 3, np.float32)
+    collection.foreach_get("co", co)
+    co = co.reshape(-1, 3)
+    co -= offset
+    collection.foreach_set("co", co.ravel())
+
+
+@timed
+def center_mesh_on_bounds(mesh):
+    # Move the vertices so their bounding box is centred on the origin.
+    # Returns the applied offset in mesh space, or None if nothing moved.
+    # NumPy is imported here so loading the add-on doesn't pay for it.
+    import numpy as np
+    count = len(mesh.vertices)
+    if not count:
+        return None
+    co = np.empty(count * 3, np.float32)
+    mesh.vertices.foreach_get("co", co)
+    co = co.reshape(-1, 3)
+    offset = (co.min(axis=0) + co.max(axis=0)) * 0.5
+    if not np.any(np.abs(offset) > 1e-7):
+        return None
+
+    co -= offset
+    mesh.vertices.foreach_set("co", co.ravel())
+    if mesh.shape_keys:
+        for key in mesh.shape_keys.key_blocks:
+            _shift_coords(key.data, offset, count)
+    mesh.update()
+    return Vector(offset.tolist())
+
+
+def move_origin(obj, world, offset, skip=()):
+    # Place `obj` so its shifted mesh looks unchanged, and keep its children
+    # (other than those in `skip`, which are placed separately) where they
+    # were, like Set Origin does
+    obj.matrix_world = world @ Matrix.Translation(offset)
+    back = Matrix.Translation(-offset)
+    for child in obj.children:
+        if child not in skip:
+            child.matrix_parent_inverse = back @ child.matrix_parent_inverse
+
+
+@timed
+def reparent_meshes(meshes, armature):
+    # Parent to the armature keeping world transforms, then move origins to
+    # the geometry bounds. Meshes shared by several objects are shifted once
+    # and every user of them is compensated.
+    worlds = [obj.matrix_world.copy() for obj in meshes]
+    offsets = {}
+    for obj in meshes:
+        if obj.data not in offsets:
+            offsets[obj.data] = center_mesh_on_bounds(obj.data)
+
+    handled = set(meshes)
+    for obj, world in zip(meshes, worlds):
+        obj.parent = armature
+        offset = offsets[obj.data]
+        if offset is None:
+            obj.matrix_world = world
+        else:
+            move_origin(obj, world, offset, handled)
+
+    # Users outside this hierarchy (e.g. linked duplicates) keep their look too
+    local_users = {}
+    for obj in meshes:
+        local_users[obj.data] = local_users.get(obj.data, 0) + 1
+    shared = {m: o for m, o in offsets.items() if o is not None and m.users > local_users[m]}
+    if shared:
+        for obj in bpy.data.objects:
+            if obj.type == 'MESH' and obj.data in shared and obj not in handled:
+                move_origin(obj, obj.matrix_world, shared[obj.data], handled)
+
+
+@timed
+def convert_empty_roots_to_armatures(root_names, report=None):
+    # Convert several roots at once: one edit-mode session for every armature
+    # and one batch_remove for all LOD1 meshes and empties. Returns one entry
+    # per name: the new armature, or None where the root was missing.
+    timings = {}
+    start = time.perf_counter()
+
+    roots = []
+    found = []
+    for name in root_names:
+        root_empty = bpy.data.objects.get(name)
+        if root_empty:
+            roots.append(root_empty)
+            found.append(name)
+        elif report:
+            report({'ERROR'}, f"Root empty '{name}' not found.")
+    if not roots:
+        return [None] * len(root_names)
+    hierarchies = [gather_hierarchy(root) for root in roots]
+    timings["gather"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    armatures = [new_armature_for(root) for root in roots]
+    timings["create"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    enter_edit_mode(armatures)
+    for armature, root in zip(armatures, roots):
+        add_edit_bones(armature, root)
+    exit_edit_mode()
+    timings["bones"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for armature, (_, meshes, _) in zip(armatures, hierarchies):
+        reparent_meshes(meshes, armature)
+    timings["reparent"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    doomed = []
+    for empties, _, lod1 in hierarchies:
+        doomed.extend(lod1)
+        doomed.extend(empties)
+    bpy.data.batch_remove(doomed)
+    timings["cleanup"] = time.perf_counter() - start
+
+    total = sum(timings.values())
+    phases = ", ".join(f"{k} {v:.3f}s" for k, v in timings.items())
+    print(f"[EFT Bones] {len(roots)} roots in {total:.3f}s ({phases})")
+    by_root = dict(zip(found, armatures))
+    return [by_root.get(name) for name in root_names]
+
+
+def convert_empty_root_to_armature(root_name, report=None):
+    # Returns the new armature object, or None if the root is missing
+    return convert_empty_roots_to_armatures([root_name], report)[0]
@@ -0,0 +1,314 @@
+import os
+import sys
+import glob
+import time
+import json
+import argparse
+
+# Headless weapon builds.
+#
+#   blender --background --python EFTWeaponBuilder/build_cli.py -- replay \
+#       --mods D:/Mods --weapons D:/Weapons --out D:/Builds presets/*.json
+#
+#   blender --background --python EFTWeaponBuilder/build_cli.py -- render \
+#       --mods D:/Mods --weapons D:/Weapons --out D:/Thumbs --shard 0/4
+#
+# `replay` rebuilds every build preset (see presets.py) in a clean scene and
+# saves one .blend per preset.
+#
+# `render` builds every weapon in weapon_compatibility.json with a default
+# mod set (the first available mod of each compatible category) and renders
+# and/or saves it. Weapons are matched to weapon folders by name (see
+# folder_matcher.FolderMatcher) unless a --weapon-map JSON file says otherwise.
+# Each shard keeps a checkpoint so an interrupted run picks up where it
+# stopped.
+
+import bpy
+
+# Import the add-on as a package from the folder above this script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import EFTWeaponBuilder as addon
+from EFTWeaponBuilder import presets
+from EFTWeaponBuilder.fileio import write_json, script_args
+from EFTWeaponBuilder.folder_matcher import FolderMatcher
+
+
+def cli_report(level, message):
+    print(f"[EFT Build CLI] {next(iter(level))}: {message}")
+
+
+def ensure_registered():
+    if not hasattr(bpy.types.Scene, "eft_props"):
+        addon.register()
+
+
+def configure(scene, args):
+    p = scene.eft_props
+    # Setting the folders runs their update callbacks, which load the indexes
+    if args.weapons:
+        p.weapons_folder = args.weapons
+    if args.mods:
+        p.mods_folder = args.mods
+    p.use_asset_cache = args.asset_cache
+    if args.import_mode:
+        p.import_mode = args.import_mode
+
+
+def clear_scene():
+    # Remove every object, then the data they left without users. Node groups
+    # (the EFT shader) stay loaded.
+    bpy.data.batch_remove(list(bpy.data.objects))
+    orphans = [
+        block
+        for blocks in (
+            bpy.data.meshes, bpy.data.armatures, bpy.data.materials,
+            bpy.data.images, bpy.data.cameras, bpy.data.lights,
+        )
+        for block in blocks if block.users == 0
+    ]
+    if orphans:
+        bpy.data.batch_remove(orphans)
+
+
+def expand(patterns):
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        files.extend(matches or [pattern])
+    return files
+
+
+def cmd_replay(args):
+    ensure_registered()
+    configure(bpy.context.scene, args)
+    os.makedirs(args.out, exist_ok=True)
+
+    failed = 0
+    start = time.perf_counter()
+    files = expand(args.presets)
+    for path in files:
+        name = os.path.splitext(os.path.basename(path))[0]
+        try:
+            preset = presets.load_preset(path)
+        except (OSError, ValueError) as e:
+            print(f"[EFT Build CLI] {path}: {e}")
+            failed += 1
+            continue
+
+        try:
+            clear_scene()
+            summary = addon.replay_preset(bpy.context, preset, cli_report)
+            out = os.path.join(args.out, f"{name}.blend")
+            bpy.ops.wm.save_as_mainfile(filepath=out, copy=True)
+        except Exception as e:
+            print(f"[EFT Build CLI] {path}: failed: {e}")
+            failed += 1
+            continue
+        print(f"[EFT Build CLI] {name}: {summary['seconds']:.2f}s → {out}")
+
+    print(f"[EFT Build CLI] {len(files) - failed} presets built, {failed} failed in {time.perf_counter() - start:.1f}s")
+    return 1 if failed else 0
+
+
+# --- RENDER ---
+def parse_shard(text):
+    index, count = (int(v) for v in text.split("/", 1))
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError("shard must be i/N with 0 <= i < N")
+    return index, count
+
+
+def load_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path, data):
+    write_json(path, data, indent=1, sort_keys=True)
+
+
+def default_mods(weapon_type, categories=None):
+    # First mod (by name) of each compatible category that exists in the library
+    compat = addon.weapon_compat_data
+    index = addon.weapon_mod_index
+    mods = []
+    for category, names in sorted(compat.get(weapon_type, {}).items()):
+        if categories and category not in categories:
+            continue
+        for name in names:
+            if index and index.fbx_path(category, name):
+                mods.append({"category": category, "name": name, "parent": None, "bone": None})
+                break
+    return mods
+
+
+def safe_filename(name):
+    return "".join(c if c.isalnum() or c in "-_. " else "_" for c in name).strip()
+
+
+def frame_camera(scene, size):
+    # Orthographic camera looking across the build's thinnest axis, plus a sun
+    from mathutils import Vector
+
+    corners = [
+        obj.matrix_world @ Vector(c)
+        for obj in scene.objects if obj.type == 'MESH'
+        for c in obj.bound_box
+    ]
+    if not corners:
+        return False
+    lo = Vector(tuple(min(c[i] for c in corners) for i in range(3)))
+    hi = Vector(tuple(max(c[i] for c in corners) for i in range(3)))
+    center = (lo + hi) / 2
+    extent = hi - lo
+    axis = min(range(3), key=lambda i: extent[i])
+
+    cam_data = bpy.data.cameras.new("EFT_Thumb_Camera")
+    cam_data.type = 'ORTHO'
+    cam_data.ortho_scale = max(extent) * 1.1 or 1.0
+    cam = bpy.data.objects.new("EFT_Thumb_Camera", cam_data)
+    scene.collection.objects.link(cam)
+    direction = Vector((0, 0, 0))
+    direction[axis] = 1.0
+    cam.location = center + direction * (max(extent) * 2 + 1)
+    cam.rotation_euler = (-direction).to_track_quat('-Z', 'Y').to_euler()
+    cam_data.clip_end = max(extent) * 4 + 10
+    scene.camera = cam
+
+    sun = bpy.data.objects.new("EFT_Thumb_Sun", bpy.data.lights.new("EFT_Thumb_Sun", 'SUN'))
+    scene.collection.objects.link(sun)
+    sun.rotation_euler = cam.rotation_euler
+
+    scene.render.resolution_x = size
+    scene.render.resolution_y = size
+    scene.render.film_transparent = True
+    return True
+
+
+def cmd_render(args):
+    ensure_registered()
+    scene = bpy.context.scene
+    configure(scene, args)
+    if args.engine:
+        scene.render.engine = args.engine
+    os.makedirs(args.out, exist_ok=True)
+
+    shard_index, shard_count = args.shard
+    checkpoint_path = args.checkpoint or os.path.join(
+        args.out, f"checkpoint_{shard_index}of{shard_count}.json"
+    )
+    checkpoint = load_json(checkpoint_path, {"weapons": {}})
+    done = checkpoint.setdefault("weapons", {})
+
+    weapon_map = load_json(args.weapon_map, {}) if args.weapon_map else {}
+    matcher = FolderMatcher(addon.weapon_folder_data)
+    weapons = sorted(addon.weapon_compat_data)
+    if args.only:
+        weapons = [w for w in weapons if args.only.lower() in w.lower()]
+    weapons = weapons[shard_index::shard_count]
+    categories = set(args.categories.split(",")) if args.categories else None
+
+    print(f"[EFT Build CLI] shard {shard_index}/{shard_count}: {len(weapons)} weapons, checkpoint {checkpoint_path}")
+    failed = 0
+    start = time.perf_counter()
+    for weapon_type in weapons:
+        if done.get(weapon_type, {}).get("status") in ("ok", "unmatched"):
+            continue
+        folder = weapon_map.get(weapon_type) or matcher.match(weapon_type)
+        if not folder:
+            print(f"[EFT Build CLI] {weapon_type}: no matching weapon folder")
+            done[weapon_type] = {"status": "unmatched"}
+            save_json(checkpoint_path, checkpoint)
+            continue
+
+        name = safe_filename(weapon_type)
+        t0 = time.perf_counter()
+        try:
+            clear_scene()
+            preset = {
+                "version": presets.PRESET_VERSION,
+                "weapon": folder,
+                "weapon_type": weapon_type,
+                "texture_mode": args.texture_mode,
+                "use_tail": True,
+                "mods": default_mods(weapon_type, categories),
+            }
+            summary = addon.replay_preset(bpy.context, preset, cli_report)
+            outputs = []
+            if args.output in ("render", "both"):
+                if not frame_camera(scene, args.size):
+                    raise RuntimeError("nothing to render")
+                scene.render.filepath = os.path.join(args.out, f"{name}.png")
+                bpy.ops.render.render(write_still=True)
+                outputs.append(scene.render.filepath)
+            if args.output in ("blend", "both"):
+                path = os.path.join(args.out, f"{name}.blend")
+                bpy.ops.wm.save_as_mainfile(filepath=path, copy=True)
+                outputs.append(path)
+        except Exception as e:
+            print(f"[EFT Build CLI] {weapon_type}: failed: {e}")
+            done[weapon_type] = {"status": "failed", "folder": folder, "error": str(e)}
+            failed += 1
+        else:
+            done[weapon_type] = {
+                "status": "ok",
+                "folder": folder,
+                "mods": len(preset["mods"]),
+                "attached": summary["attached"] + summary["auto_attached"],
+                "seconds": round(time.perf_counter() - t0, 2),
+                "outputs": outputs,
+            }
+            print(f"[EFT Build CLI] {weapon_type}: {time.perf_counter() - t0:.1f}s")
+        save_json(checkpoint_path, checkpoint)
+
+    print(f"[EFT Build CLI] shard done in {time.perf_counter() - start:.1f}s, {failed} failed")
+    return 1 if failed else 0
+
+
+def add_library_args(parser):
+    parser.add_argument("--mods", help="Mods folder")
+    parser.add_argument("--weapons", help="Weapons folder")
+    parser.add_argument("--asset-cache", action="store_true", help="Use the asset cache for imports")
+    parser.add_argument("--import-mode", choices=("IMPORT", "LINKED"), help="Import mode")
+
+
+def parse_args(argv):
+    argv = script_args(argv)
+    parser = argparse.ArgumentParser(description="Build EFT weapons without the UI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    replay = commands.add_parser("replay", help="Rebuild build presets and save each as a .blend")
+    add_library_args(replay)
+    replay.add_argument("--out", required=True, help="Folder for the built .blend files")
+    replay.add_argument("presets", nargs="+", help="Preset files or glob patterns")
+    replay.set_defaults(func=cmd_replay)
+
+    render = commands.add_parser("render", help="Build and render every weapon in the compatibility data")
+    add_library_args(render)
+    render.add_argument("--out", required=True, help="Folder for renders, .blend files and the checkpoint")
+    render.add_argument("--output", choices=("render", "blend", "both"), default="render")
+    render.add_argument("--shard", type=parse_shard, default=(0, 1), help="i/N: build every N-th weapon starting at i")
+    render.add_argument("--checkpoint", help="Checkpoint file (default: <out>/checkpoint_<i>of<N>.json)")
+    render.add_argument("--weapon-map", help="JSON {compat weapon name: 'category/folder'} overriding name matching")
+    render.add_argument("--categories", help="Comma-separated mod categories to include (default: all)")
+    render.add_argument("--only", help="Only weapons whose name contains this text")
+    render.add_argument("--texture-mode", choices=presets.TEXTURE_MODES, default="EFT")
+    render.add_argument("--engine", help="Render engine, e.g. BLENDER_EEVEE or CYCLES")
+    render.add_argument("--size", type=int, default=512, help="Square render size in pixels")
+    render.set_defaults(func=cmd_render)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    code = main()
+    if bpy.app.background:
+        sys.exit(code)
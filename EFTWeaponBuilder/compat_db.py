@@ -0,0 +1,290 @@
+import os
+import sys
+import json
+import zlib
+import hashlib
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+
+from .fileio import write_atomic
+from .library_index import CACHE_DIRNAME
+
+# Compiled form of weapon_compatibility.json.
+#
+# Mod names are interned in sorted order, so every per-(weapon, category) id
+# list is also sorted by name. The id lists are kept flat in a few uint32
+# arrays indexed by span arrays, with a reverse mod -> weapons index
+# alongside, so loading the compiled file is a handful of array copies. The compiled file is rebuilt only when the JSON's hash changes;
+# size + mtime are checked first so the hash is only computed on a mismatch.
+
+COMPAT_FILENAME = "weapon_compatibility.json"
+COMPILED_FILENAME = "weapon_compatibility.bin"
+COMPILED_VERSION = 3
+
+
+def _hash_bytes(raw):
+    return hashlib.sha1(raw).hexdigest()
+
+
+def _flatten(groups):
+    # [ids, ...] -> (spans, ids) with group i at ids[spans[i]:spans[i + 1]]
+    spans = array('I', [0])
+    ids = array('I')
+    for group in groups:
+        ids.extend(sorted(group))
+        spans.append(len(ids))
+    return spans, ids
+
+
+def compile_compat(data):
+    weapons = list(data)
+    categories = sorted({cat for cats in data.values() for cat in cats})
+    mods = sorted({m for cats in data.values() for ms in cats.values() for m in ms})
+    cat_ids = {c: i for i, c in enumerate(categories)}
+    mod_ids = {m: i for i, m in enumerate(mods)}
+
+    # Weapon w owns entries rows[w]:rows[w + 1]; entry e is category
+    # row_cats[e] with the sorted mod ids row_ids[row_spans[e]:row_spans[e + 1]]
+    rows = array('I', [0])
+    row_cats = array('I')
+    row_spans = array('I', [0])
+    row_ids = array('I')
+    reverse = [set() for _ in mods]
+    mod_cats = [set() for _ in mods]
+    for w_id, weapon in enumerate(weapons):
+        for cat, ms in data[weapon].items():
+            ids = sorted({mod_ids[m] for m in ms})
+            for m in ids:
+                reverse[m].add(w_id)
+                mod_cats[m].add(cat_ids[cat])
+            row_cats.append(cat_ids[cat])
+            row_ids.extend(ids)
+            row_spans.append(len(row_ids))
+        rows.append(len(row_cats))
+
+    reverse_spans, reverse_ids = _flatten(reverse)
+    mod_cat_spans, mod_cat_ids = _flatten(mod_cats)
+    return {
+        "version": COMPILED_VERSION,
+        "weapons": weapons,
+        "categories": categories,
+        "mods": mods,
+        "rows": rows,
+        "row_cats": row_cats,
+        "row_spans": row_spans,
+        "row_ids": row_ids,
+        "reverse_spans": reverse_spans,
+        "reverse_ids": reverse_ids,
+        "mod_cat_spans": mod_cat_spans,
+        "mod_cat_ids": mod_cat_ids,
+    }
+
+
+class CompatDB(Mapping):
+    # Read-only mapping of weapon -> {category: (mod, ...)} backed by the compiled arrays
+
+    def __init__(self, compiled=None):
+        compiled = compiled or compile_compat({})
+        self.weapons = compiled["weapons"]
+        self.categories = compiled["categories"]
+        self.mods = compiled["mods"]
+        self._rows = compiled["rows"]
+        self._row_cats = compiled["row_cats"]
+        self._row_spans = compiled["row_spans"]
+        self._row_ids = compiled["row_ids"]
+        self._reverse_spans = compiled["reverse_spans"]
+        self._reverse_ids = compiled["reverse_ids"]
+        self._mod_cat_spans = compiled["mod_cat_spans"]
+        self._mod_cat_ids = compiled["mod_cat_ids"]
+        self.source_hash = compiled.get("source_hash")
+        self._weapon_ids = {w: i for i, w in enumerate(self.weapons)}
+        self._mod_ids = {m: i for i, m in enumerate(self.mods)}
+        self._cache = {}
+
+    # --- MAPPING ---
+    def __getitem__(self, weapon):
+        row = self._cache.get(weapon)
+        if row is None:
+            w_id = self._weapon_ids[weapon]
+            mods = self.mods
+            cats = self.categories
+            spans = self._row_spans
+            ids = self._row_ids
+            row = self._cache[weapon] = {
+                cats[self._row_cats[e]]: tuple(mods[m] for m in ids[spans[e]:spans[e + 1]])
+                for e in range(self._rows[w_id], self._rows[w_id + 1])
+            }
+        return row
+
+    def __iter__(self):
+        return iter(self.weapons)
+
+    def __len__(self):
+        return len(self.weapons)
+
+    def __contains__(self, weapon):
+        return weapon in self._weapon_ids
+
+    # --- QUERIES ---
+    def mods_for(self, weapon, category):
+        if weapon not in self._weapon_ids:
+            return ()
+        return self[weapon].get(category, ())
+
+    def weapons_for_mod(self, mod):
+        m = self._mod_ids.get(mod)
+        if m is None:
+            return ()
+        spans = self._reverse_spans
+        return tuple(self.weapons[w] for w in self._reverse_ids[spans[m]:spans[m + 1]])
+
+    def categories_for_mod(self, mod):
+        m = self._mod_ids.get(mod)
+        if m is None:
+            return ()
+        spans = self._mod_cat_spans
+        return tuple(self.categories[c] for c in self._mod_cat_ids[spans[m]:spans[m + 1]])
+
+    def mods_by_category(self):
+        out = {}
+        spans = self._mod_cat_spans
+        for m, mod in enumerate(self.mods):
+            for c in self._mod_cat_ids[spans[m]:spans[m + 1]]:
+                out.setdefault(self.categories[c], []).append(mod)
+        return out
+
+    def is_compatible(self, weapon, mod):
+        w = self._weapon_ids.get(weapon)
+        m = self._mod_ids.get(mod)
+        if w is None or m is None:
+            return False
+        lo, hi = self._reverse_spans[m], self._reverse_spans[m + 1]
+        i = bisect_left(self._reverse_ids, w, lo, hi)
+        return i < hi and self._reverse_ids[i] == w
+
+
+# On disk: MAGIC, a 4-byte little-endian header length, a small JSON header
+# with the names and array lengths, then the arrays back to back as one
+# little-endian uint32 blob. Plain data only, since the file lives next to
+# the library and may sit on a shared drive. Staleness is decided by the
+# source stamp; a CRC of the blob plus the array lengths catch a torn or
+# damaged file without walking every id on load.
+MAGIC = b"EFTCDB\x00\x03"
+ARRAYS = (
+    "rows", "row_cats", "row_spans", "row_ids",
+    "reverse_spans", "reverse_ids", "mod_cat_spans", "mod_cat_ids",
+)
+
+
+def _pack(compiled):
+    blob = array('I')
+    for name in ARRAYS:
+        blob.extend(compiled[name])
+    if sys.byteorder != "little":
+        blob.byteswap()
+    header = {
+        "version": compiled["version"],
+        "source_hash": compiled.get("source_hash"),
+        "source_stamp": list(compiled.get("source_stamp") or ()),
+        "weapons": compiled["weapons"],
+        "categories": compiled["categories"],
+        "mods": compiled["mods"],
+        "lengths": [len(compiled[name]) for name in ARRAYS],
+    }
+    data = blob.tobytes()
+    header["blob_crc"] = zlib.crc32(data)
+    head = json.dumps(header, separators=(",", ":")).encode('utf-8')
+    return MAGIC + len(head).to_bytes(4, "little") + head + data
+
+
+def _unpack(raw):
+    # Returns the compiled dict, or None if anything doesn't check out
+    if raw[:len(MAGIC)] != MAGIC:
+        return None
+    pos = len(MAGIC)
+    size = int.from_bytes(raw[pos:pos + 4], "little")
+    header = json.loads(raw[pos + 4:pos + 4 + size].decode('utf-8'))
+    lengths = header.get("lengths")
+    if (
+        header.get("version") != COMPILED_VERSION
+        or not isinstance(lengths, list)
+        or len(lengths) != len(ARRAYS)
+    ):
+        return None
+    data = raw[pos + 4 + size:]
+    if sum(lengths) * 4 != len(data) or header.get("blob_crc") != zlib.crc32(data):
+        return None
+
+    blob = array('I')
+    blob.frombytes(data)
+    if sys.byteorder != "little":
+        blob.byteswap()
+    compiled = {
+        "version": COMPILED_VERSION,
+        "source_hash": header.get("source_hash"),
+        "source_stamp": tuple(header.get("source_stamp") or ()),
+        "weapons": header["weapons"],
+        "categories": header["categories"],
+        "mods": header["mods"],
+    }
+    offset = 0
+    for name, length in zip(ARRAYS, lengths):
+        compiled[name] = blob[offset:offset + length]
+        offset += length
+
+    n_weapons = len(compiled["weapons"])
+    n_mods = len(compiled["mods"])
+    # (spans, number of groups, ids they index)
+    checks = (
+        ("rows", n_weapons, "row_cats"),
+        ("row_spans", len(compiled["row_cats"]), "row_ids"),
+        ("reverse_spans", n_mods, "reverse_ids"),
+        ("mod_cat_spans", n_mods, "mod_cat_ids"),
+    )
+    for spans_name, groups, ids_name in checks:
+        spans = compiled[spans_name]
+        if len(spans) != groups + 1 or spans[0] != 0 or spans[-1] != len(compiled[ids_name]):
+            return None
+    return compiled
+
+
+def _write_compiled(path, compiled):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, _pack(compiled))
+    except OSError as e:
+        print(f"[EFT Compat] Could not write compiled data '{path}': {e}")
+
+
+def _read_compiled(path):
+    try:
+        with open(path, 'rb') as f:
+            return _unpack(f.read())
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+# Load `<root>/weapon_compatibility.json`, reusing the compiled cache when the
+# source is unchanged. Raises OSError / ValueError like json.load would.
+def load(root):
+    base = os.path.abspath(root)
+    src = os.path.join(base, COMPAT_FILENAME)
+    dst = os.path.join(base, CACHE_DIRNAME, COMPILED_FILENAME)
+
+    st = os.stat(src)
+    compiled = _read_compiled(dst)
+    if compiled and compiled.get("source_stamp") == (st.st_size, st.st_mtime_ns):
+        return CompatDB(compiled)
+
+    with open(src, 'rb') as f:
+        raw = f.read()
+    digest = _hash_bytes(raw)
+
+    if not compiled or compiled.get("source_hash") != digest:
+        compiled = compile_compat(json.loads(raw.decode('utf-8')))
+        compiled["source_hash"] = digest
+        print(f"[EFT Compat] Compiled '{src}'")
+    compiled["source_stamp"] = (st.st_size, st.st_mtime_ns)
+    _write_compiled(dst, compiled)
+    return CompatDB(compiled)
@@ -0,0 +1,32 @@
+import os
+import json
+
+# Small file helpers shared by the add-on and the command-line scripts.
+#
+# No bpy and no relative imports: bake_cli.py and its worker processes load
+# the helper modules as top-level modules from this folder.
+
+
+def write_atomic(path, data):
+    # Write str (UTF-8) or bytes to a temporary file, then move it into place
+    # so readers never see a half-written file
+    tmp = path + ".tmp"
+    if isinstance(data, str):
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(data)
+    else:
+        with open(tmp, 'wb') as f:
+            f.write(data)
+    os.replace(tmp, path)
+
+
+def write_json(path, data, **kwargs):
+    # kwargs go to json.dumps (indent, separators, sort_keys)
+    write_atomic(path, json.dumps(data, **kwargs))
+
+
+def script_args(argv):
+    # Blender passes its own arguments first; a script's follow "--"
+    if "--" in argv:
+        return argv[argv.index("--") + 1:]
+    return argv
@@ -0,0 +1,38 @@
+from .mod_search import tokenize
+
+# Used by build_cli.py to find the weapon folder of each weapon in the
+# compatibility data.
+
+
+class FolderMatcher:
+    # Matches long display names ("Colt M4A1 5.56x45 assault rifle") to
+    # library folder names ("weapon_colt_m4a1_556x45"). Query tokens found in
+    # a folder name score by rarity across all folders, so "m4a1" outweighs
+    # "rifle"; ties go to the shorter, then alphabetically first, path.
+
+    def __init__(self, groups):
+        # groups: {category: iterable of folder names}
+        self.paths = [f"{category}/{name}" for category, names in groups.items() for name in names]
+        self.lowered = [p.split("/", 1)[1].lower() for p in self.paths]
+        self.compact = [low.replace("_", "").replace("-", "") for low in self.lowered]
+        self._weights = {}
+
+    def _weight(self, token):
+        w = self._weights.get(token)
+        if w is None:
+            hits = sum(1 for c in self.compact if token in c)
+            w = self._weights[token] = 1.0 / hits if hits else 0.0
+        return w
+
+    def match(self, name, min_score=0.5):
+        tokens = [t.replace(".", "") for t in tokenize(name.replace("/", " "))]
+        tokens = [t for t in tokens if len(t) >= 2]
+        best = None
+        for i, compact in enumerate(self.compact):
+            score = sum(self._weight(t) for t in tokens if t in compact)
+            if score < min_score:
+                continue
+            key = (-score, len(self.paths[i]), self.paths[i])
+            if best is None or key < best:
+                best = key
+        return best[2] if best else None
@@ -0,0 +1,312 @@
+import os
+import time
+import zlib
+import struct
+
+import numpy as np
+
+try:
+    from .fileio import write_atomic
+except ImportError:
+    # Loaded as a top-level module by bake_cli.py and its workers
+    from fileio import write_atomic
+
+# Gloss -> roughness conversion on flat float32 pixel buffers.
+#
+# Works on the RGBA(-ish) layout Blender's Image.pixels uses: the red channel
+# is read as sRGB gloss, converted to linear and inverted into R, G and B;
+# a fourth (alpha) channel is passed through unchanged.
+#
+# This module must stay importable without bpy: the batch bake runs its
+# worker functions in separate processes, and the headless CLI reuses them.
+
+
+def srgb_to_linear(c):
+    # Piecewise sRGB curve on a float32 array; returns a new array, `c` is left as is
+    low = c <= 0.04045
+    lin = np.power((c + 0.055) / 1.055, 2.4, dtype=np.float32)
+    lin[low] = c[low] / 12.92
+    return lin
+
+
+def gloss_to_roughness(pixels, channels=4):
+    px = np.asarray(pixels, dtype=np.float32).reshape(-1, channels)
+    inv = srgb_to_linear(px[:, 0])
+    np.subtract(1.0, inv, out=inv)
+
+    out = np.empty_like(px)
+    out[:, :min(channels, 3)] = inv[:, None]
+    if channels == 4:
+        out[:, 3] = px[:, 3]
+    return out.reshape(-1)
+
+
+# --- 8-BIT CONVERSION ---
+_lut = None
+
+
+def roughness_lut():
+    # Same result as gloss_to_roughness on byte/255 inputs, rounded the way
+    # Blender quantizes float pixels when saving an 8-bit PNG
+    global _lut
+    if _lut is None:
+        inv = 1.0 - srgb_to_linear(np.arange(256, dtype=np.float32) / 255.0)
+        _lut = np.clip(inv * 255.0 + 0.5, 0, 255).astype(np.uint8)
+    return _lut
+
+
+def to_u8(values):
+    return np.clip(np.asarray(values, dtype=np.float32) * 255.0 + 0.5, 0, 255).astype(np.uint8)
+
+
+def convert_planes(gloss, alpha=None):
+    # gloss / alpha: (h, w) uint8 or float32 planes -> (h, w, 3|4) uint8 roughness
+    if gloss.dtype == np.uint8:
+        rough = roughness_lut()[gloss]
+    else:
+        rough = to_u8(1.0 - srgb_to_linear(gloss.astype(np.float32)))
+    channels = 3 if alpha is None else 4
+    out = np.empty(gloss.shape + (channels,), np.uint8)
+    out[..., :3] = rough[..., None]
+    if alpha is not None:
+        out[..., 3] = alpha if alpha.dtype == np.uint8 else to_u8(alpha)
+    return out
+
+
+# --- PNG I/O ---
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+def _unfilter_rows(out, raw, kinds, bpp):
+    # None/Sub/Up rows only depend on the row above: one row at a time
+    prev = np.zeros(out.shape[1], np.uint8)
+    for y, kind in enumerate(kinds):
+        line = raw[y]
+        if kind == 0:
+            out[y] = line
+        elif kind == 1:
+            out[y] = np.cumsum(line.reshape(-1, bpp), axis=0, dtype=np.uint8).reshape(-1)
+        else:
+            out[y] = line + prev
+        prev = out[y]
+
+
+def _unfilter_wavefront(out, raw, kinds, bpp):
+    # Average/Paeth bytes depend on their left, upper and upper-left pixels,
+    # all of which lie on earlier anti-diagonals (y + x), so each diagonal is
+    # decoded as one vector step for every filter type at once. The pixels
+    # are padded with a zero row and column (the missing edge neighbours) and
+    # flattened, which makes every diagonal a strided slice.
+    height = raw.shape[0]
+    width = raw.shape[1] // bpp
+    row = width + 1
+    src = np.zeros((height + 1, row, bpp), np.uint8)
+    src[1:, 1:] = raw.reshape(height, width, bpp)
+    kind = np.zeros((height + 1, row, 1), np.uint8)
+    kind[1:, 1:] = np.asarray(kinds)[:, None, None]
+    dec = np.zeros_like(src)
+    src = src.reshape(-1, bpp)
+    kind = kind.reshape(-1, 1)
+    flat = dec.reshape(-1, bpp)
+
+    for d in range(height + width - 1):
+        y0 = max(0, d - width + 1)
+        count = min(height, d + 1) - y0
+        # Padded index of (y0, d - y0); moving down the diagonal adds `width`
+        start = (y0 + 1) * row + d - y0 + 1
+        span = (count - 1) * width + 1
+
+        def at(offset):
+            return flat[start - offset:start - offset + span:width].astype(np.int16)
+
+        a, b, c = at(1), at(row), at(row + 1)
+        k = kind[start:start + span:width]
+        p = a + b - c
+        pa = np.abs(p - a)
+        pb = np.abs(p - b)
+        pc = np.abs(p - c)
+        paeth = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+        pred = np.select([k == 1, k == 2, k == 3, k == 4], [a, b, (a + b) >> 1, paeth], 0)
+        flat[start:start + span:width] = src[start:start + span:width] + pred.astype(np.uint8)
+    out[:] = dec[1:, 1:].reshape(height, -1)
+
+
+def _decode_png(data):
+    # Minimal decoder: non-interlaced, 8/16-bit gray, RGB, palette, gray+alpha, RGBA
+    if data[:8] != _PNG_SIGNATURE:
+        raise ValueError("not a PNG file")
+    pos = 8
+    header = None
+    idat = []
+    palette = None
+    transparency = None
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        chunk = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", chunk)
+        elif kind == b"IDAT":
+            idat.append(chunk)
+        elif kind == b"PLTE":
+            palette = chunk
+        elif kind == b"tRNS":
+            transparency = chunk
+        elif kind == b"IEND":
+            break
+    if header is None:
+        raise ValueError("missing IHDR")
+
+    width, height, depth, color, _, _, interlace = header
+    if interlace:
+        raise ValueError("interlaced PNG not supported")
+    if color not in _PNG_CHANNELS or depth not in (8, 16) or (color == 3 and depth != 8):
+        raise ValueError(f"unsupported PNG format (color type {color}, depth {depth})")
+
+    channels = _PNG_CHANNELS[color]
+    bpp = channels * depth // 8
+    stride = width * bpp
+    raw = np.frombuffer(zlib.decompress(b"".join(idat)), np.uint8)
+    raw = raw[:height * (stride + 1)].reshape(height, stride + 1)
+
+    kinds = raw[:, 0]
+    if kinds.max(initial=0) > 4:
+        raise ValueError(f"bad PNG filter type {kinds.max()}")
+    out = np.empty((height, stride), np.uint8)
+    if (kinds >= 3).any():
+        _unfilter_wavefront(out, raw[:, 1:], kinds, bpp)
+    else:
+        _unfilter_rows(out, raw[:, 1:], kinds, bpp)
+
+    if depth == 16:
+        # Keep the high byte of each sample
+        out = out.reshape(height, width * channels, 2)[:, :, 0]
+    pixels = out.reshape(height, width, channels)
+
+    if color == 3:
+        lut = np.frombuffer(palette, np.uint8).reshape(-1, 3)
+        if transparency:
+            alpha = np.full(len(lut), 255, np.uint8)
+            alpha[:len(transparency)] = np.frombuffer(transparency, np.uint8)[:len(lut)]
+            lut = np.concatenate([lut, alpha[:, None]], axis=1)
+        pixels = lut[pixels[:, :, 0]]
+    return pixels
+
+
+def has_fast_decoder():
+    try:
+        import PIL.Image
+    except ImportError:
+        return False
+    return True
+
+
+def read_png(path):
+    # (h, w, channels) uint8, top row first. Uses Pillow when it is installed.
+    try:
+        from PIL import Image
+    except ImportError:
+        Image = None
+    if Image is not None:
+        with Image.open(path) as im:
+            if im.mode not in ("L", "LA", "RGB", "RGBA"):
+                im = im.convert("RGBA")
+            pixels = np.asarray(im)
+        return pixels if pixels.ndim == 3 else pixels[:, :, None]
+    with open(path, 'rb') as f:
+        return _decode_png(f.read())
+
+
+def _png_chunk(kind, payload):
+    return (
+        struct.pack(">I", len(payload)) + kind + payload
+        + struct.pack(">I", zlib.crc32(kind + payload) & 0xFFFFFFFF)
+    )
+
+
+def write_png(path, pixels, level=6):
+    height, width, channels = pixels.shape
+    color = {1: 0, 2: 4, 3: 2, 4: 6}[channels]
+    rows = np.ascontiguousarray(pixels, dtype=np.uint8).reshape(height, -1)
+
+    # "Up" filter on every row: vectorizes trivially and suits smooth maps
+    filtered = np.empty((height, rows.shape[1] + 1), np.uint8)
+    filtered[:, 0] = 2
+    filtered[0, 1:] = rows[0]
+    np.subtract(rows[1:], rows[:-1], out=filtered[1:, 1:])
+
+    header = struct.pack(">IIBBBBB", width, height, 8, color, 0, 0, 0)
+    data = b"".join((
+        _PNG_SIGNATURE,
+        _png_chunk(b"IHDR", header),
+        _png_chunk(b"IDAT", zlib.compress(filtered.tobytes(), level)),
+        _png_chunk(b"IEND", b""),
+    ))
+    write_atomic(path, data)
+    return len(data)
+
+
+def share_image_planes(image):
+    # Copy the gloss (red) and alpha planes of a Blender image into shared
+    # memory, top row first. Only the Image API is used, so bpy isn't imported.
+    from multiprocessing import shared_memory
+
+    w, h = image.size
+    c = image.channels
+    if not w or not h:
+        raise ValueError(f"image '{image.name}' has no pixels")
+    buf = np.empty(w * h * c, dtype=np.float32)
+    image.pixels.foreach_get(buf)
+    px = buf.reshape(h, w, c)[::-1]
+
+    has_alpha = c == 4
+    dtype = np.dtype(np.float32 if image.is_float else np.uint8)
+    shape = (2 if has_alpha else 1, h, w)
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * dtype.itemsize)
+    planes = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    for i, channel in enumerate((0, 3) if has_alpha else (0,)):
+        planes[i] = to_u8(px[:, :, channel]) if dtype == np.uint8 else px[:, :, channel]
+    del planes
+    return shm, shape, dtype.str, has_alpha
+
+
+# --- WORKER ENTRY POINTS ---
+# Both return a small dict so results pickle cheaply back to the caller.
+
+def convert_file(src, dst):
+    start = time.perf_counter()
+    pixels = read_png(src)
+    channels = pixels.shape[2]
+    alpha = pixels[:, :, channels - 1] if channels in (2, 4) else None
+    written = write_png(dst, convert_planes(pixels[:, :, 0], alpha))
+    return {
+        "src": src,
+        "dst": dst,
+        "seconds": time.perf_counter() - start,
+        "bytes_read": os.path.getsize(src),
+        "bytes_written": written,
+    }
+
+
+def convert_shared(shm_name, shape, dtype, has_alpha, dst):
+    # Planes were decoded by the caller (e.g. from Blender's Image.pixels) and
+    # placed in shared memory as (planes, h, w), top row first
+    from multiprocessing import shared_memory
+
+    start = time.perf_counter()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        planes = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        rough = convert_planes(planes[0], planes[1] if has_alpha else None)
+        written = write_png(dst, rough)
+        del planes
+    finally:
+        shm.close()
+    return {
+        "src": shm_name,
+        "dst": dst,
+        "seconds": time.perf_counter() - start,
+        "bytes_read": 0,
+        "bytes_written": written,
+    }
@@ -0,0 +1,198 @@
+import os
+import json
+
+try:
+    from .fileio import write_json
+except ImportError:
+    # Loaded as a top-level module by bake_cli.py
+    from fileio import write_json
+
+# Persistent index of a "<root>/<category>/<mod>/" library tree.
+#
+# The index is kept next to the library in a hidden cache folder so the root
+# directory mtime is not touched every time it is rewritten. Every directory
+# level stores its mtime, and a refresh only re-lists folders whose mtime
+# differs from the stored one.
+
+CACHE_DIRNAME = ".eft_cache"
+INDEX_FILENAME = "library_index.json"
+INDEX_VERSION = 2
+
+# In-memory indexes keyed by absolute root path
+_indexes = {}
+
+
+class ScanCancelled(Exception):
+    pass
+
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _list_dirs(path):
+    # Visible sub-directory names, in listing order
+    out = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.name.startswith("."):
+                continue
+            try:
+                if entry.is_dir():
+                    out.append(entry.name)
+            except OSError:
+                continue
+    return out
+
+
+class LibraryIndex:
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.mtime = None
+        # category -> {"mtime": int, "mods": {mod: {"mtime": int, "fbx": str|None, "files": [str]}}}
+        self.categories = {}
+        self.generation = 0
+        self._by_lower = None
+
+    # --- PATHS ---
+    def cache_dir(self):
+        return os.path.join(self.root, CACHE_DIRNAME)
+
+    def index_path(self):
+        return os.path.join(self.cache_dir(), INDEX_FILENAME)
+
+    def mod_path(self, category, mod):
+        return os.path.join(self.root, category, mod)
+
+    # --- QUERIES ---
+    def mod_names(self):
+        return {cat: list(entry["mods"]) for cat, entry in self.categories.items()}
+
+    def files(self, category, mod):
+        entry = self.categories.get(category, {}).get("mods", {}).get(mod)
+        return entry["files"] if entry else []
+
+    def fbx_path(self, category, mod):
+        entry = self.categories.get(category, {}).get("mods", {}).get(mod)
+        if not entry or not entry["fbx"]:
+            return None
+        return os.path.join(self.root, category, mod, entry["fbx"])
+
+    def find_category(self, mod):
+        # Case-insensitive lookup of the category holding a mod folder
+        if self._by_lower is None:
+            self._by_lower = {}
+            for cat, entry in self.categories.items():
+                for name in entry["mods"]:
+                    self._by_lower.setdefault(name.lower(), (cat, name))
+        return self._by_lower.get(mod.lower(), (None, None))
+
+    # --- REFRESH ---
+    # Re-stat the tree and re-list only folders whose mtime changed.
+    # Returns the number of directories that had to be re-listed.
+    # `progress(category, entry)` is called as each category is finished and
+    # `cancelled()` is polled between categories (raises ScanCancelled).
+    def refresh(self, progress=None, cancelled=None):
+        changed = 0
+
+        root_mtime = _mtime_ns(self.root)
+        if root_mtime is None:
+            raise FileNotFoundError(self.root)
+        if root_mtime != self.mtime:
+            old = self.categories
+            self.categories = {}
+            for name in _list_dirs(self.root):
+                self.categories[name] = old.get(name) or {"mtime": None, "mods": {}}
+            self.mtime = root_mtime
+            changed += 1
+
+        for category, entry in self.categories.items():
+            if cancelled and cancelled():
+                raise ScanCancelled(self.root)
+            cat_path = os.path.join(self.root, category)
+            cat_mtime = _mtime_ns(cat_path)
+            if cat_mtime != entry["mtime"]:
+                old = entry["mods"]
+                entry["mods"] = {}
+                for name in _list_dirs(cat_path):
+                    entry["mods"][name] = old.get(name) or {"mtime": None, "fbx": None, "files": []}
+                entry["mtime"] = cat_mtime
+                changed += 1
+
+            for mod, mod_entry in entry["mods"].items():
+                mod_path = os.path.join(cat_path, mod)
+                mod_mtime = _mtime_ns(mod_path)
+                if mod_mtime == mod_entry["mtime"]:
+                    continue
+                try:
+                    files = [f for f in os.listdir(mod_path) if not f.startswith(".")]
+                except OSError:
+                    files = []
+                # Match the FBX like Windows would, but keep the real file name
+                by_lower = {f.casefold(): f for f in files}
+                mod_entry["mtime"] = mod_mtime
+                mod_entry["files"] = files
+                mod_entry["fbx"] = by_lower.get(f"{mod}.fbx".casefold())
+                changed += 1
+            if progress:
+                progress(category, entry)
+
+        if changed:
+            self.generation += 1
+            self._by_lower = None
+        return changed
+
+    # --- PERSISTENCE ---
+    def to_dict(self):
+        return {
+            "version": INDEX_VERSION,
+            "root": self.root,
+            "mtime": self.mtime,
+            "categories": self.categories,
+        }
+
+    def save(self):
+        path = self.index_path()
+        try:
+            os.makedirs(self.cache_dir(), exist_ok=True)
+            write_json(path, self.to_dict(), separators=(",", ":"))
+        except OSError as e:
+            # Read-only library: keep the index in memory only
+            print(f"[EFT Index] Could not write index '{path}': {e}")
+
+    @classmethod
+    def load(cls, root):
+        index = cls(root)
+        try:
+            with open(index.index_path(), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                index.mtime = data.get("mtime")
+                index.categories = data.get("categories", {})
+        except (OSError, ValueError):
+            pass
+        return index
+
+
+# Make `index` the in-memory index for its root (e.g. after a background
+# refresh). Its generation moves past the replaced index so caches keyed on
+# (root, generation) are invalidated.
+def publish(index):
+    old = _indexes.get(index.root)
+    if old is not None and old is not index:
+        index.generation = max(index.generation, old.generation + 1)
+    _indexes[index.root] = index
+
+
+# Return the index for `root`, loading the persisted copy on first use
+def get_index(root, refresh=True):
+    key = os.path.abspath(root)
+    index = _indexes.get(key)
+    if index is None:
+        index = _indexes[key] = LibraryIndex.load(key)
+    if refresh and index.refresh():
+        index.save()
+    return index
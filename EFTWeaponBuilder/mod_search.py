@@ -0,0 +1,171 @@
+import re
+
+# Trigram search index over every mod name, used by the `filter_text` box.
+#
+# A query is answered for all categories at once: candidates come from the
+# trigram postings (or a plain scan of pre-lowered names for 1-2 character
+# queries) and are ranked by substring hit, token-prefix hits and per-token
+# edit distance, then by name length.
+
+_TOKEN_SPLIT = re.compile(r"[\s_\-.()]+")
+
+
+def tokenize(text):
+    return [t for t in _TOKEN_SPLIT.split(text.lower()) if t]
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def max_edits(token):
+    if len(token) <= 3:
+        return 0
+    if len(token) <= 6:
+        return 1
+    return 2
+
+
+def edit_distance(a, b, limit):
+    # Levenshtein distance, giving up early once it exceeds `limit`
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        best = i
+        for j, cb in enumerate(b, 1):
+            d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            cur.append(d)
+            if d < best:
+                best = d
+        if best > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+class ModSearchIndex:
+    def __init__(self, groups):
+        # groups: {category: iterable of mod names}
+        ids = {}
+        self.names = []
+        self.lowered = []
+        self.categories = []
+        for category, mods in groups.items():
+            for name in mods:
+                i = ids.get(name)
+                if i is None:
+                    i = ids[name] = len(self.names)
+                    self.names.append(name)
+                    self.lowered.append(name.lower())
+                    self.categories.append([])
+                if category not in self.categories[i]:
+                    self.categories[i].append(category)
+
+        self.postings = {}
+        self.vocabulary = {}
+        for i, low in enumerate(self.lowered):
+            for g in trigrams(low):
+                self.postings.setdefault(g, set()).add(i)
+            for t in tokenize(low):
+                self.vocabulary.setdefault(t, set()).add(i)
+        # Token prefix -> name ids, built per prefix length on demand, plus
+        # buckets by the characters in the first two positions so fuzzy
+        # matching only compares against prefixes sharing one of them (which
+        # still finds a letter dropped or added at the front)
+        self._prefixes = {}
+        self._buckets = {}
+        order = sorted(range(len(self.lowered)), key=lambda i: (len(self.lowered[i]), self.lowered[i]))
+        self._order = [0] * len(order)
+        for rank, i in enumerate(order):
+            self._order[i] = rank
+
+    def _prefix_map(self, n):
+        pm = self._prefixes.get(n)
+        if pm is None:
+            pm = self._prefixes[n] = {}
+            for t, ids in self.vocabulary.items():
+                if len(t) >= n:
+                    pm.setdefault(t[:n], set()).update(ids)
+            buckets = self._buckets[n] = {}
+            for prefix in pm:
+                for c in set(prefix[:2]):
+                    buckets.setdefault(c, []).append(prefix)
+        return pm
+
+    def _substring_ids(self, qt):
+        grams = trigrams(qt)
+        if not grams:
+            return {i for i, low in enumerate(self.lowered) if qt in low}
+        ids = None
+        for g in sorted(grams, key=lambda g: len(self.postings.get(g, ()))):
+            found = self.postings.get(g)
+            if not found:
+                return set()
+            ids = set(found) if ids is None else ids & found
+        return {i for i in ids if qt in self.lowered[i]}
+
+    def _match_token(self, qt):
+        # name id -> (is prefix hit, edit distance) for one query token
+        pm = self._prefix_map(len(qt))
+        hits = {i: (True, 0) for i in pm.get(qt, ())}
+        for i in self._substring_ids(qt):
+            hits.setdefault(i, (False, 0))
+        limit = max_edits(qt)
+        if not limit:
+            return hits
+        # Prefixes up to `limit` shorter or longer, so dropped and extra
+        # letters match as well as swapped ones
+        for n in range(max(1, len(qt) - limit), len(qt) + limit + 1):
+            pm = self._prefix_map(n)
+            buckets = self._buckets[n]
+            similar = set(buckets.get(qt[0], ())) | set(buckets.get(qt[1], ()))
+            for prefix in similar:
+                if prefix == qt:
+                    continue
+                d = edit_distance(qt, prefix, limit)
+                if d > limit:
+                    continue
+                for i in pm[prefix]:
+                    if i not in hits or hits[i][1] > d:
+                        hits[i] = (False, d)
+        return hits
+
+    # Returns {category: [mod names, best match first]}
+    def query(self, text):
+        query = text.strip().lower()
+        if not query:
+            return {}
+        qtokens = tokenize(query) or [query]
+
+        scores = None
+        for qt in qtokens:
+            hits = self._match_token(qt)
+            if scores is None:
+                scores = {i: [int(p), d] for i, (p, d) in hits.items()}
+            else:
+                merged = {}
+                for i, (p, d) in hits.items():
+                    prev = scores.get(i)
+                    if prev is not None:
+                        merged[i] = [prev[0] + p, prev[1] + d]
+                scores = merged
+            if not scores:
+                return {}
+
+        # Few distinct (substring, prefix hits, distance) keys: bucket on those
+        # and order each bucket by the precomputed (length, name) rank
+        lowered = self.lowered
+        buckets = {}
+        for i, (p, d) in scores.items():
+            buckets.setdefault((query not in lowered[i], -p, d), []).append(i)
+        ranked = []
+        for key in sorted(buckets):
+            ranked.extend(sorted(buckets[key], key=self._order.__getitem__))
+
+        results = {}
+        for i in ranked:
+            for category in self.categories[i]:
+                results.setdefault(category, []).append(self.names[i])
+        return results
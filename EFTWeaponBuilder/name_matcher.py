@@ -0,0 +1,64 @@
+from collections import deque
+
+# Aho-Corasick automaton over many names at once.
+#
+# `longest(text)` scans the text once and returns the value of the longest
+# pattern found anywhere in it, so "scope_x_blk" beats "scope_x" in
+# "scope_x_blk_lod0". Ties between equally long patterns go to the one
+# added first.
+
+
+class NameMatcher:
+    def __init__(self, patterns):
+        # patterns: iterable of (lowercase pattern, value)
+        self.goto = [{}]
+        self.fail = [0]
+        # Best (length, -order, value) of any pattern ending in each state
+        self.out = [None]
+
+        for order, (pattern, value) in enumerate(patterns):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(None)
+                state = nxt
+            if self.out[state] is None:
+                self.out[state] = (len(pattern), -order, value)
+
+        # Breadth-first so every failure target is finished before it is used.
+        # A state's own pattern is always longer than anything reached through
+        # its failure link, so it only inherits when it has none.
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                if self.out[nxt] is None:
+                    self.out[nxt] = self.out[self.fail[nxt]]
+                queue.append(nxt)
+
+    def longest(self, text):
+        goto = self.goto
+        fail = self.fail
+        out = self.out
+        state = 0
+        best = None
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            found = out[state]
+            if found is not None and (best is None or found[:2] > best[:2]):
+                best = found
+        return best[2] if best else None
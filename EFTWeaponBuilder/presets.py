@@ -0,0 +1,87 @@
+import os
+import re
+import json
+
+from .fileio import write_json
+
+# Build presets: everything needed to rebuild a weapon in one go.
+#
+#   {
+#     "version": 1,
+#     "weapon": "assault rifles/weapon_ak74",     # selected_weapon, or null
+#     "weapon_type": "AK-74 5.45x39 assault rifle", # compat entry, or "NONE"
+#     "texture_mode": "EFT",
+#     "use_tail": true,
+#     "mods": [
+#       {"category": "mounts", "name": "mount_x", "parent": null, "bone": "mod_mount"},
+#       {"category": "scopes", "name": "scope_y", "parent": 0, "bone": "mod_scope"}
+#     ]
+#   }
+#
+# "parent" is the index of another entry in "mods" (null: the weapon) and
+# "bone" the bone on it; a null bone leaves the mod to Auto Attach.
+
+PRESET_VERSION = 1
+TEXTURE_MODES = ("EFT", "PRINCIPLED", "NONE")
+
+
+def clean_name(armature_name):
+    # "Armature_scope_y.001" -> "scope_y"
+    return re.sub(r'\.\d{3}$', '', armature_name.removeprefix("Armature_"))
+
+
+def weapon_fbx_path(weapons_root, weapon):
+    category, name = weapon.split("/", 1)
+    return os.path.join(weapons_root, category, name, f"{name}.fbx")
+
+
+def mod_fbx_path(mods_root, category, name):
+    return os.path.join(mods_root, category, name, f"{name}.fbx")
+
+
+def _is_name(value):
+    return isinstance(value, str) and bool(value.strip())
+
+
+def validate(preset):
+    # Raises ValueError on anything replay could trip over
+    if not isinstance(preset, dict) or preset.get("version") != PRESET_VERSION:
+        raise ValueError("not a version 1 build preset")
+    if preset.get("texture_mode", "EFT") not in TEXTURE_MODES:
+        raise ValueError(f"unknown texture mode {preset.get('texture_mode')!r}")
+    weapon = preset.get("weapon")
+    if weapon is not None:
+        category, _, name = weapon.partition("/") if isinstance(weapon, str) else ("", "", "")
+        if not _is_name(category) or not _is_name(name):
+            raise ValueError(f"weapon {weapon!r} is not 'category/name'")
+    if not isinstance(preset.get("weapon_type", "NONE"), str):
+        raise ValueError("weapon_type must be a string")
+    if not isinstance(preset.get("use_tail", True), bool):
+        raise ValueError("use_tail must be true or false")
+    mods = preset.get("mods")
+    if not isinstance(mods, list):
+        raise ValueError("mods must be a list")
+    for i, mod in enumerate(mods):
+        if not isinstance(mod, dict):
+            raise ValueError(f"mod {i} is not an object")
+        if not _is_name(mod.get("category")) or not _is_name(mod.get("name")):
+            raise ValueError(f"mod {i} needs a category and a name")
+        bone = mod.get("bone")
+        if bone is not None and not isinstance(bone, str):
+            raise ValueError(f"mod {i} has an invalid bone {bone!r}")
+        parent = mod.get("parent")
+        if parent is not None and not (
+            type(parent) is int and 0 <= parent < len(mods) and parent != i
+        ):
+            raise ValueError(f"mod {i} has an invalid parent {parent!r}")
+    return preset
+
+
+def load_preset(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return validate(json.load(f))
+
+
+def save_preset(path, preset):
+    validate(preset)
+    write_json(path, preset, indent=1)
@@ -0,0 +1,265 @@
+import io
+import os
+import time
+import builtins
+import functools
+import threading
+from collections import deque
+
+from .fileio import write_json
+
+# Opt-in instrumentation for operator runs.
+#
+# While enabled, every instrumented operator call becomes a Run recording its
+# wall time, the helpers decorated with @timed that it went through (call
+# counts and time), the files it touched, and optionally a cProfile summary.
+# Files are recorded through builtins.open (covers the Python FBX importer
+# and JSON reads) plus explicit touch() calls for paths Blender reads in C,
+# like images. Those reads can't be counted, so each file opened for reading
+# contributes its whole size ("MB in files read"), not the bytes actually
+# read. Nothing is recorded on other threads. The last `max_runs` runs are
+# kept and can be exported as a Chrome trace (chrome://tracing, Perfetto).
+
+MAX_EVENTS = 20000
+STATS_LINES = 25
+
+
+class Run:
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.seconds = 0.0
+        self.result = ""
+        self.calls = {}     # helper name -> [count, seconds]
+        self.files = {}     # path -> file size if opened for reading, else 0
+        self.events = []    # (name, category, offset, seconds)
+        self.stats = ""
+
+    @property
+    def read_file_bytes(self):
+        return sum(self.files.values())
+
+    def top_calls(self, count=3):
+        return sorted(self.calls.items(), key=lambda kv: kv[1][1], reverse=True)[:count]
+
+    def describe(self):
+        return (
+            f"{self.name}: {self.seconds:.2f}s, {len(self.files)} files, "
+            f"{self.read_file_bytes / (1024 * 1024):.1f} MB in files read"
+        )
+
+    def summary(self):
+        return {
+            "name": self.name,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "seconds": round(self.seconds, 6),
+            "result": self.result,
+            "calls": {
+                name: {"count": count, "seconds": round(seconds, 6)}
+                for name, (count, seconds) in sorted(self.calls.items())
+            },
+            "files": dict(sorted(self.files.items())),
+            "read_file_bytes": self.read_file_bytes,
+            "stats": self.stats,
+        }
+
+
+class Profiler:
+    def __init__(self, max_runs=10):
+        self.enabled = False
+        self.use_cprofile = False
+        self.runs = deque(maxlen=max_runs)
+        self.current = None
+        self.thread = None
+        self._open = None
+
+    def set_max_runs(self, count):
+        self.runs = deque(self.runs, maxlen=max(1, count))
+
+    def clear(self):
+        self.runs.clear()
+
+    def active(self):
+        return self.current is not None and threading.get_ident() == self.thread
+
+    # --- Files ---
+    def touch(self, path, read=True):
+        if not self.active() or not isinstance(path, (str, os.PathLike)):
+            return
+        path = os.path.normpath(os.fspath(path))
+        if read and not self.current.files.get(path):
+            try:
+                self.current.files[path] = os.path.getsize(path)
+            except OSError:
+                self.current.files[path] = 0
+        else:
+            self.current.files.setdefault(path, 0)
+
+    def _tracked_open(self, file, mode='r', *args, **kwargs):
+        handle = self._open(file, mode, *args, **kwargs)
+        self.touch(file, read='r' in mode or '+' in mode)
+        return handle
+
+    # --- Spans and runs ---
+    def span(self, name, category="helper"):
+        return _Span(self, name, category) if self.active() else _NOOP
+
+    def run(self, name):
+        # A top-level run, or a span when another run is in progress
+        # (operators calling operators)
+        if not self.enabled or self.current is not None:
+            return self.span(name, "operator")
+        return _RunContext(self, name)
+
+    def _begin(self, name):
+        run = Run(name)
+        self.current = run
+        self.thread = threading.get_ident()
+        self._open = builtins.open
+        builtins.open = self._tracked_open
+        if self.use_cprofile:
+            import cProfile
+            run._profile = cProfile.Profile()
+            try:
+                run._profile.enable()
+            except ValueError:
+                # Another profiler (a debugger, an outer cProfile) is active
+                run._profile = None
+        return run
+
+    def _end(self, run):
+        run.seconds = time.perf_counter() - run.start
+        profile = getattr(run, "_profile", None)
+        if profile is not None:
+            import pstats
+            profile.disable()
+            out = io.StringIO()
+            pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(STATS_LINES)
+            run.stats = out.getvalue()
+            del run._profile
+        if builtins.open == self._tracked_open:
+            builtins.open = self._open
+        self.current = None
+        self.thread = None
+        self.runs.append(run)
+        print(f"[EFT Profile] {run.describe()}")
+
+    # --- Export ---
+    def chrome_trace(self):
+        events = []
+        for run in self.runs:
+            base = run.started * 1e6
+            events.append({
+                "name": run.name, "cat": "operator", "ph": "X", "pid": 1, "tid": 1,
+                "ts": base, "dur": run.seconds * 1e6,
+                "args": {"result": run.result, "files": len(run.files), "read_file_bytes": run.read_file_bytes},
+            })
+            for name, category, offset, seconds in run.events:
+                events.append({
+                    "name": name, "cat": category, "ph": "X", "pid": 1, "tid": 1,
+                    "ts": base + offset * 1e6, "dur": seconds * 1e6,
+                })
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"runs": [run.summary() for run in self.runs]},
+        }
+
+    def export(self, path):
+        write_json(path, self.chrome_trace(), indent=1)
+        return len(self.runs)
+
+
+class _Span:
+    def __init__(self, profiler, name, category):
+        self.run = profiler.current
+        self.name = name
+        self.category = category
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return None
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        entry = self.run.calls.setdefault(self.name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        if len(self.run.events) < MAX_EVENTS:
+            self.run.events.append((self.name, self.category, self.start - self.run.start, elapsed))
+        return False
+
+
+class _RunContext:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.run = self.profiler._begin(self.name)
+        return self.run
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.run.result = f"error: {exc}"
+        self.profiler._end(self.run)
+        return False
+
+
+class _Noop:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _Noop()
+recorder = Profiler()
+
+
+def timed(func):
+    # Record calls to `func` in the active run; a plain call otherwise
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if recorder.current is None:
+            return func(*args, **kwargs)
+        with recorder.span(name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def instrument(cls):
+    # Wrap an operator's execute (or invoke, for modal operators without one)
+    # in a run. Blender checks the argument count, so the wrappers keep the
+    # original signatures.
+    execute = cls.__dict__.get("execute")
+    if execute is not None and not hasattr(execute, "__wrapped__"):
+        @functools.wraps(execute)
+        def execute_wrapper(self, context):
+            if not recorder.enabled:
+                return execute(self, context)
+            with recorder.run(cls.bl_idname) as run:
+                result = execute(self, context)
+                if run is not None:
+                    run.result = ",".join(sorted(result))
+            return result
+        cls.execute = execute_wrapper
+        return cls
+
+    invoke = cls.__dict__.get("invoke")
+    if execute is None and invoke is not None and not hasattr(invoke, "__wrapped__"):
+        @functools.wraps(invoke)
+        def invoke_wrapper(self, context, event):
+            if not recorder.enabled:
+                return invoke(self, context, event)
+            with recorder.run(cls.bl_idname) as run:
+                result = invoke(self, context, event)
+                if run is not None:
+                    run.result = ",".join(sorted(result))
+            return result
+        cls.invoke = invoke_wrapper
+    return cls
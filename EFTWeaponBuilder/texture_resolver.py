@@ -0,0 +1,107 @@
+import os
+import re
+
+# Shared texture lookup for the auto-texture operators.
+#
+# Each texture folder is listed once per operator run. Files are indexed by
+# (LOD0 base name, role) for exact hits and by a per-role prefix trie for the
+# "closest name" fallback, which picks the file sharing the longest common
+# prefix with the mesh's LOD0 base (first in listing order on ties).
+
+TEXTURE_ROLES = {
+    "diff": ("_diff",),
+    "gloss": ("_gloss", "_glos", "_spec"),
+    "normal": ("_nrm", "_normal"),
+}
+
+
+def lod0_base(obj_name):
+    # Normalize name (remove .001, .002) and cut after the last "_lod0"
+    clean_name = re.sub(r'\.\d{3}$', '', obj_name.lower())
+    match = re.match(r"(.*_lod0)", clean_name)
+    return match.group(1) if match else None
+
+
+class _TrieNode:
+    __slots__ = ("children", "first")
+
+    def __init__(self, first):
+        self.children = {}
+        # Lowest listing position of any file below this node
+        self.first = first
+
+
+class TextureFolder:
+    def __init__(self, path, files):
+        self.path = path
+        self.files = files
+        self.exact = {}
+        self.tries = {}
+
+        for pos, f in enumerate(files):
+            name = os.path.splitext(f)[0].lower()
+            if "lod1" in name:
+                continue
+            for role, keywords in TEXTURE_ROLES.items():
+                if not any(k in name for k in keywords):
+                    continue
+                # Every "..._lod0" prefix of the name is a base it matches exactly
+                start = name.find("_lod0")
+                while start != -1:
+                    self.exact.setdefault((name[:start + 5], role), pos)
+                    start = name.find("_lod0", start + 1)
+                self._insert(role, name, pos)
+
+    def _insert(self, role, name, pos):
+        node = self.tries.get(role)
+        if node is None:
+            node = self.tries[role] = _TrieNode(pos)
+        for ch in name:
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _TrieNode(pos)
+            node = child
+
+    def find(self, obj_name, role):
+        expected_base = lod0_base(obj_name)
+        if not expected_base:
+            return None
+
+        pos = self.exact.get((expected_base, role))
+        if pos is not None:
+            return self.files[pos]
+
+        # --- Fallback: choose closest matching texture ---
+        node = self.tries.get(role)
+        if node is None:
+            return None
+        depth = 0
+        for ch in expected_base:
+            child = node.children.get(ch)
+            if child is None:
+                break
+            node = child
+            depth += 1
+        if depth == 0:
+            return None
+
+        best = self.files[node.first]
+        print(f"[Fallback Texture] {obj_name} → {best}")
+        return best
+
+
+class TextureResolver:
+    # One per operator run: folders are listed and indexed on first use
+
+    def __init__(self):
+        self.folders = {}
+
+    def folder(self, path):
+        folder = self.folders.get(path)
+        if folder is None:
+            folder = self.folders[path] = TextureFolder(path, os.listdir(path))
+        return folder
+
+    def find_textures(self, tex_folder, obj_name):
+        folder = self.folder(tex_folder)
+        return tuple(folder.find(obj_name, role) for role in TEXTURE_ROLES)
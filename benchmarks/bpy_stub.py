@@ -0,0 +1,146 @@
+import os
+import sys
+import types
+
+# Minimal stand-ins for `bpy` and `mathutils`, just enough to import the
+# add-on package under plain CPython and call its pure-Python paths
+# (library scanning, compat data, dropdown items, texture lookup).
+# Anything that needs real Blender data is out of scope.
+
+
+class _Struct:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+def _prop(kind):
+    def make(**kwargs):
+        return (kind, kwargs)
+    make.__name__ = kind
+    return make
+
+
+class _IDCollection(dict):
+    # bpy.data.<collection>: name -> datablock, iterating over values
+    def __iter__(self):
+        return iter(list(self.values()))
+
+    def remove(self, block, **kwargs):
+        self.pop(getattr(block, "name", None), None)
+
+
+class _Timers(types.ModuleType):
+    def __init__(self):
+        super().__init__("bpy.app.timers")
+        self._registered = set()
+
+    def register(self, fn, first_interval=0.0, persistent=False):
+        self._registered.add(fn)
+
+    def unregister(self, fn):
+        self._registered.discard(fn)
+
+    def is_registered(self, fn):
+        return fn in self._registered
+
+
+def _abspath(path, start=None, library=None):
+    if path.startswith("//"):
+        return os.path.join(start or os.getcwd(), path[2:])
+    return path
+
+
+def build_bpy():
+    bpy = types.ModuleType("bpy")
+
+    bpy_types = types.ModuleType("bpy.types")
+    for name in (
+        "PropertyGroup", "Operator", "Panel", "Menu", "UIList",
+        "Scene", "Object", "Armature", "Collection", "Image", "Material",
+    ):
+        setattr(bpy_types, name, type(name, (_Struct,), {}))
+
+    props = types.ModuleType("bpy.props")
+    for kind in (
+        "BoolProperty", "IntProperty", "FloatProperty", "StringProperty",
+        "EnumProperty", "PointerProperty", "CollectionProperty",
+    ):
+        setattr(props, kind, _prop(kind))
+
+    path = types.ModuleType("bpy.path")
+    path.abspath = _abspath
+    path.ensure_ext = lambda p, ext: p if p.lower().endswith(ext) else p + ext
+
+    utils = types.ModuleType("bpy.utils")
+    utils.register_class = lambda cls: None
+    utils.unregister_class = lambda cls: None
+
+    app = types.ModuleType("bpy.app")
+    app.background = True
+    app.version = (3, 6, 0)
+    app.timers = _Timers()
+    handlers = types.ModuleType("bpy.app.handlers")
+    handlers.persistent = lambda fn: fn
+    handlers.load_post = []
+    handlers.depsgraph_update_post = []
+    app.handlers = handlers
+
+    data = types.SimpleNamespace(
+        objects=_IDCollection(),
+        images=_IDCollection(),
+        materials=_IDCollection(),
+        node_groups=_IDCollection(),
+        filepath="",
+    )
+
+    bpy.types = bpy_types
+    bpy.props = props
+    bpy.path = path
+    bpy.utils = utils
+    bpy.app = app
+    bpy.data = data
+    bpy.ops = types.SimpleNamespace()
+    bpy.context = types.SimpleNamespace(scene=None, preferences=None)
+    return bpy
+
+
+def build_mathutils():
+    mathutils = types.ModuleType("mathutils")
+    for name in ("Vector", "Matrix", "Quaternion", "Euler"):
+        setattr(mathutils, name, type(name, (_Struct,), {}))
+    return mathutils
+
+
+def install():
+    # Put the stubs in sys.modules; returns the fake bpy module
+    if "bpy" in sys.modules and not getattr(sys.modules["bpy"], "_eft_stub", False):
+        raise RuntimeError("a real bpy module is already loaded")
+    bpy = build_bpy()
+    bpy._eft_stub = True
+    sys.modules.update({
+        "bpy": bpy,
+        "bpy.types": bpy.types,
+        "bpy.props": bpy.props,
+        "bpy.path": bpy.path,
+        "bpy.utils": bpy.utils,
+        "bpy.app": bpy.app,
+        "bpy.app.timers": bpy.app.timers,
+        "bpy.app.handlers": bpy.app.handlers,
+        "mathutils": build_mathutils(),
+    })
+    return bpy
+
+
+def fake_context(mods_folder="", weapons_folder="", weapon_type="NONE", filter_text=""):
+    props = types.SimpleNamespace(
+        mods_folder=mods_folder,
+        weapons_folder=weapons_folder,
+        selected_weapon="NONE",
+        weapon_type=weapon_type,
+        filter_text=filter_text,
+    )
+    return types.SimpleNamespace(scene=types.SimpleNamespace(eft_props=props))
+
+
+def fake_object(name, parent=None, kind='MESH'):
+    return types.SimpleNamespace(name=name, parent=parent, type=kind)
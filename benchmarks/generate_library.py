@@ -0,0 +1,121 @@
+import os
+import sys
+import json
+import random
+import argparse
+
+# Synthetic mods/weapons libraries for the benchmarks.
+#
+# Scale 1 matches the shipped weapon_compatibility.json: 140 weapons, 1028
+# mods over 18 categories, ~6 categories per weapon with ~6 mods each. Every
+# mod folder holds a (zero-byte) FBX plus LOD0/LOD1 diffuse, gloss and normal
+# maps, named the way AssetStudio exports them.
+#
+#   python benchmarks/generate_library.py --scale 10 D:/tmp/eft_x10
+
+BASE_WEAPONS = 140
+BASE_MODS = 1028
+
+CATEGORIES = {
+    "barrels": "barrel",
+    "bipods": "bipod",
+    "charges": "charge",
+    "foregrips": "foregrip",
+    "gasblock": "gas_block",
+    "handguards": "handguard",
+    "magazines": "mag",
+    "mechanics": "trigger",
+    "mounts": "mount",
+    "muzzle": "muzzle",
+    "pistol grips": "pistolgrip",
+    "recievers": "reciever",
+    "scopes": "scope",
+    "sights front": "sight_front",
+    "sights rear": "sight_rear",
+    "silencers": "silencer",
+    "stocks": "stock",
+    "tactical": "tactical",
+}
+WEAPON_CATEGORIES = ("assault rifles", "carbines", "pistols", "smgs", "shotguns", "snipers", "machineguns")
+PLATFORMS = ("ak", "ar15", "mp5", "sks", "m700", "glock", "aug", "mosin", "svd", "sa58", "mpx", "uzi")
+VENDORS = ("izhmash", "magpul", "kac", "zenit", "troy", "geissele", "midwest", "sig", "hk", "colt", "tochmash")
+VARIANTS = ("", "_blk", "_fde", "_od", "_wood", "_tan")
+
+
+def mod_names(count, rng):
+    prefixes = list(CATEGORIES.items())
+    names = {}
+    i = 0
+    while len(names) < count:
+        category, prefix = prefixes[i % len(prefixes)]
+        name = (
+            f"{prefix}_{rng.choice(PLATFORMS)}_{rng.choice(VENDORS)}_"
+            f"{rng.choice(('std', 'pro', 'gen2', 'tactical', 'light'))}_{i}{rng.choice(VARIANTS)}"
+        )
+        names[name] = category
+        i += 1
+    return names
+
+
+def touch_mod(folder, name):
+    os.makedirs(folder, exist_ok=True)
+    files = [f"{name}.fbx"]
+    for lod in ("LOD0", "LOD1"):
+        files += [f"{name}_{lod}_diff.png", f"{name}_{lod}_gloss.png", f"{name}_{lod}_nrm.png"]
+    for f in files:
+        open(os.path.join(folder, f), 'wb').close()
+
+
+def generate(root, scale=1, seed=0):
+    rng = random.Random(seed)
+    mods_root = os.path.join(root, "mods")
+    weapons_root = os.path.join(root, "weapons")
+
+    mods = mod_names(BASE_MODS * scale, rng)
+    by_category = {}
+    for name, category in mods.items():
+        by_category.setdefault(category, []).append(name)
+        touch_mod(os.path.join(mods_root, category, name), name)
+
+    compat = {}
+    weapons = []
+    for i in range(BASE_WEAPONS * scale):
+        platform = rng.choice(PLATFORMS)
+        display = f"{rng.choice(VENDORS).title()} {platform.upper()}-{i} {rng.choice(('5.56x45', '7.62x39', '9x19'))} {rng.choice(('assault rifle', 'carbine', 'pistol'))}"
+        folder = f"weapon_{rng.choice(VENDORS)}_{platform}_{i}"
+        category = rng.choice(WEAPON_CATEGORIES)
+        weapons.append((category, folder))
+        touch_mod(os.path.join(weapons_root, category, folder), folder)
+
+        entry = {}
+        for cat in rng.sample(sorted(by_category), k=min(len(by_category), rng.randint(3, 9))):
+            pool = by_category[cat]
+            entry[cat] = rng.sample(pool, k=min(len(pool), rng.randint(2, 10)))
+        compat[display] = entry
+
+    with open(os.path.join(mods_root, "weapon_compatibility.json"), 'w', encoding='utf-8') as f:
+        json.dump(compat, f, indent=1)
+
+    return {
+        "root": root,
+        "mods_root": mods_root,
+        "weapons_root": weapons_root,
+        "mods": len(mods),
+        "weapons": len(weapons),
+        "scale": scale,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic EFT mods/weapons library")
+    parser.add_argument("root", help="Output folder")
+    parser.add_argument("--scale", type=int, default=1, help="Multiple of 140 weapons / 1028 mods")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    info = generate(args.root, args.scale, args.seed)
+    print(json.dumps(info, indent=1))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import contextlib
+
+# Offline benchmarks for the add-on's hot paths.
+#
+#   python benchmarks/run.py --scale 1 10 --out results.json
+#
+# Libraries are generated once per scale (see generate_library.py) and
+# reused from --data. The add-on is imported against bpy_stub, so only the
+# pure-Python paths are measured. Results are written as JSON so runs on
+# different commits can be compared.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))
+
+import bpy_stub
+import generate_library
+
+bpy_stub.install()
+import EFTWeaponBuilder as addon
+from EFTWeaponBuilder import library_index, compat_db, gloss_bake
+from EFTWeaponBuilder.texture_resolver import TextureResolver
+
+import numpy as np
+
+
+def measure(fn, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        # The add-on logs to stdout; keep that out of the timings
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - start) * 1000.0)
+    return {
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "mean_ms": round(statistics.fmean(times), 3),
+        "runs": repeat,
+    }
+
+
+def library_for(data_dir, scale):
+    root = os.path.join(data_dir, f"x{scale}")
+    info_path = os.path.join(root, "library.json")
+    try:
+        with open(info_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    shutil.rmtree(root, ignore_errors=True)
+    print(f"Generating x{scale} library in {root} ...", file=sys.stderr)
+    info = generate_library.generate(root, scale)
+    with open(info_path, 'w', encoding='utf-8') as f:
+        json.dump(info, f)
+    return info
+
+
+def drop_cache_file(root, filename):
+    try:
+        os.remove(os.path.join(root, library_index.CACHE_DIRNAME, filename))
+    except OSError:
+        pass
+
+
+def quiet(fn, *args):
+    # Untimed calls: keep the add-on's logging off stdout, which carries the JSON
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def run_scale(info, repeat):
+    mods_root = info["mods_root"]
+    rng = random.Random(1)
+    results = {}
+
+    # --- Library index ---
+    def cold_index():
+        library_index._indexes.clear()
+        drop_cache_file(mods_root, library_index.INDEX_FILENAME)
+
+    results["load_mod_data_cold"] = measure(lambda: addon.load_mod_data(mods_root), repeat, cold_index)
+    results["load_mod_data_warm"] = measure(
+        lambda: addon.load_mod_data(mods_root), repeat, library_index._indexes.clear
+    )
+    quiet(addon.load_mod_data, mods_root)
+
+    # --- Compatibility data ---
+    results["load_compat_data_cold"] = measure(
+        lambda: addon.load_compat_data(mods_root), repeat,
+        lambda: drop_cache_file(mods_root, compat_db.COMPILED_FILENAME),
+    )
+    results["load_compat_data_warm"] = measure(lambda: addon.load_compat_data(mods_root), repeat)
+    quiet(addon.load_compat_data, mods_root)
+
+    # --- Mod dropdown items ---
+    categories = sorted(addon.weapon_mod_data)
+    weapon = sorted(addon.weapon_compat_data)[0]
+    contexts = [
+        bpy_stub.fake_context(mods_root, weapon_type="NONE"),
+        bpy_stub.fake_context(mods_root, weapon_type=weapon),
+        bpy_stub.fake_context(mods_root, weapon_type="NONE", filter_text="ak mag"),
+        bpy_stub.fake_context(mods_root, weapon_type="NONE", filter_text="magpl"),
+        bpy_stub.fake_context(mods_root, weapon_type="NONE", filter_text="mgpul"),
+    ]
+    callbacks = [addon.build_items_cb(cat) for cat in categories]
+
+    def all_items():
+        for ctx in contexts:
+            for cb in callbacks:
+                cb(None, ctx)
+
+    results["build_items_cb_cold"] = measure(all_items, repeat, addon.invalidate_mod_items)
+    results["build_items_cb_warm"] = measure(all_items, repeat)
+
+    # --- Texture folder lookup (200 meshes by name, 50 under mod armatures) ---
+    mod_pairs = [(cat, m) for cat, mods in addon.weapon_mod_data.items() for m in mods]
+    picked = rng.sample(mod_pairs, k=min(250, len(mod_pairs)))
+    objects = [bpy_stub.fake_object(f"{m}_LOD0") for _, m in picked[:200]]
+    objects += [
+        bpy_stub.fake_object(f"{m}_part_LOD0", bpy_stub.fake_object(f"Armature_{m}", kind='ARMATURE'))
+        for _, m in picked[200:]
+    ]
+    ctx = bpy_stub.fake_context(mods_root)
+
+    def resolve_folders():
+        for obj in objects:
+            addon.find_texture_folder_for(obj, ctx)
+
+    def reset_matcher():
+        addon.mod_name_matcher = None
+
+    results["find_texture_folder_for_cold"] = measure(resolve_folders, repeat, reset_matcher)
+    results["find_texture_folder_for_warm"] = measure(resolve_folders, repeat)
+
+    # --- Texture file lookup, one resolver per run like the operators ---
+    lookups = [(os.path.join(mods_root, cat, m), f"{m}_LOD0") for cat, m in picked[:200]]
+
+    def find_textures():
+        resolver = TextureResolver()
+        for folder, name in lookups:
+            resolver.find_textures(folder, name)
+
+    results["find_texture"] = measure(find_textures, repeat)
+    return results
+
+
+def run_gloss(repeat):
+    rng = np.random.default_rng(0)
+    float_px = rng.random(1024 * 1024 * 4, dtype=np.float32)
+    gloss8 = rng.integers(0, 256, (2048, 2048), dtype=np.uint8)
+    alpha8 = rng.integers(0, 256, (2048, 2048), dtype=np.uint8)
+    out_dir = tempfile.mkdtemp(prefix="eft_bench_")
+    out = os.path.join(out_dir, "rough.png")
+    try:
+        return {
+            "gloss_to_roughness_1k_float": measure(lambda: gloss_bake.gloss_to_roughness(float_px), repeat),
+            "convert_planes_2k_u8": measure(lambda: gloss_bake.convert_planes(gloss8, alpha8), repeat),
+            "write_png_2k": measure(
+                lambda: gloss_bake.write_png(out, gloss_bake.convert_planes(gloss8, alpha8)), repeat
+            ),
+        }
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark EFT Weapon Builder hot paths")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1], help="Library scales, e.g. 1 10 100")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--data", default=os.path.join(tempfile.gettempdir(), "eft_bench"),
+                        help="Where generated libraries are kept")
+    parser.add_argument("--out", help="Write results JSON here (default: stdout only)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "repeat": args.repeat,
+        },
+        "scales": {},
+        "gloss": run_gloss(args.repeat),
+    }
+    for scale in args.scale:
+        info = library_for(args.data, scale)
+        report["scales"][f"x{scale}"] = {
+            "library": {"mods": info["mods"], "weapons": info["weapons"]},
+            "results": run_scale(info, args.repeat),
+        }
+
+    text = json.dumps(report, indent=1)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())